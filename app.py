@@ -5,7 +5,8 @@ A Streamlit application for querying Humio logs and visualizing flowcharts.
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from web.app_logic import generate_flowchart_svg
+from web.app_logic import generate_flowchart_svg, watch_flowchart_svg
+from log_to_graph.humio import ADAPTIVE
 from log_to_graph.flowchart import (
     LIGHT_THEME, UNICORN_THEME, HOTDOG_THEME, VAPORWAVE_THEME,
     GAMEBOY_THEME, OCEANIC_THEME, MATRIX_THEME, AUTUMN_LEAVES_THEME,
@@ -37,6 +38,104 @@ THEMES = {
     "Solarized": SOLARIZED_THEME
 }
 
+# How long live mode keeps following a correlation ID, in seconds
+LIVE_DURATION = 15 * 60
+
+# Minimum number of seconds between two live re-renders
+LIVE_DEBOUNCE = 5.0
+
+
+def pan_zoom_html(svg_output: str) -> str:
+    """Wrap an SVG in an HTML page with svg-pan-zoom controls."""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <script src="https://cdn.jsdelivr.net/npm/svg-pan-zoom@3.6.1/dist/svg-pan-zoom.min.js"></script>
+        <style>
+            body {{
+                margin: 0;
+                padding: 0;
+                overflow: hidden;
+            }}
+            #svg-container {{
+                width: 100%;
+                height: 100vh;
+                border: 1px solid #ddd;
+                background: #f9f9f9;
+            }}
+            .controls {{
+                position: absolute;
+                top: 10px;
+                right: 10px;
+                background: white;
+                padding: 10px;
+                border-radius: 5px;
+                box-shadow: 0 2px 5px rgba(0,0,0,0.2);
+                z-index: 1000;
+            }}
+            .controls button {{
+                margin: 2px;
+                padding: 8px 12px;
+                border: 1px solid #ccc;
+                background: white;
+                cursor: pointer;
+                border-radius: 3px;
+                font-size: 14px;
+            }}
+            .controls button:hover {{
+                background: #f0f0f0;
+            }}
+            .controls button:active {{
+                background: #e0e0e0;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="controls">
+            <button onclick="panZoomInstance.zoomIn()" title="Zoom In">🔍+</button>
+            <button onclick="panZoomInstance.zoomOut()" title="Zoom Out">🔍−</button>
+            <button onclick="panZoomInstance.resetZoom()" title="Reset Zoom">↺ Reset</button>
+            <button onclick="panZoomInstance.fit()" title="Fit to Screen">⛶ Fit</button>
+            <button onclick="panZoomInstance.center()" title="Center">⊙ Center</button>
+        </div>
+        <div id="svg-container">
+            {svg_output}
+        </div>
+        <script>
+            // Initialize svg-pan-zoom
+            var panZoomInstance = svgPanZoom('#svg-container svg', {{
+                zoomEnabled: true,
+                controlIconsEnabled: false,
+                fit: true,
+                center: true,
+                minZoom: 0.1,
+                maxZoom: 10,
+                zoomScaleSensitivity: 0.3,
+                dblClickZoomEnabled: true,
+                mouseWheelZoomEnabled: true,
+                preventMouseEventsDefault: true
+            }});
+
+            // Keyboard shortcuts
+            document.addEventListener('keydown', function(e) {{
+                if (e.key === '+' || e.key === '=') {{
+                    panZoomInstance.zoomIn();
+                }} else if (e.key === '-' || e.key === '_') {{
+                    panZoomInstance.zoomOut();
+                }} else if (e.key === '0') {{
+                    panZoomInstance.resetZoom();
+                }} else if (e.key === 'f') {{
+                    panZoomInstance.fit();
+                }} else if (e.key === 'c') {{
+                    panZoomInstance.center();
+                }}
+            }});
+        </script>
+    </body>
+    </html>
+    """
+
 # Title and description
 st.title("\U0001F4CA LogNotebook - Humio Log Visualizer")
 st.markdown("Query Humio logs by correlation ID and visualize event flows as interactive flowcharts.")
@@ -68,9 +167,9 @@ with col1:
 with col2:
     start = st.selectbox(
         "Time Range",
-        options=["3h", "12h", "1d", "2d", "7d", "30d"],
-        index=2,  # Default to "1d"
-        help="How far back to search for logs"
+        options=[ADAPTIVE, "3h", "12h", "1d", "2d", "7d", "30d"],
+        index=0,  # Default to adaptive search
+        help="How far back to search for logs. 'auto' starts with the last 3 hours and widens up to 30 days until the trace is found"
     )
 
     theme_name = st.selectbox(
@@ -80,6 +179,12 @@ with col2:
         help="Visual theme for the flowchart"
     )
 
+    live_mode = st.checkbox(
+        "Live mode",
+        value=False,
+        help="Keep a live query open and update the flowchart as new events arrive"
+    )
+
 # Query button
 query_button = st.button("\U0001F680 Generate Flowchart", type="primary", use_container_width=True)
 
@@ -87,6 +192,24 @@ query_button = st.button("\U0001F680 Generate Flowchart", type="primary", use_co
 if query_button:
     if not correlation_id:
         st.warning("\u26A0\uFE0F Please enter a correlation ID.")
+    elif live_mode:
+        st.subheader("\U0001F4C8 Live Flowchart")
+        st.info(f"\U0001F534 Following new events for `{correlation_id}`. The flowchart refreshes at most every {LIVE_DEBOUNCE:.0f} seconds.")
+        placeholder = st.empty()
+        try:
+            for svg_output in watch_flowchart_svg(
+                user_token=user_token,
+                repo=repo,
+                correlation_id=correlation_id,
+                theme=THEMES[theme_name],
+                debounce=LIVE_DEBOUNCE,
+                duration=LIVE_DURATION
+            ):
+                with placeholder.container():
+                    st.components.v1.html(pan_zoom_html(svg_output), height=800, scrolling=False)
+        except Exception as e:
+            st.error(f"\u274C Error following live events: {str(e)}")
+            st.exception(e)
     else:
         with st.spinner("Querying Humio logs and generating flowchart..."):
             try:
@@ -109,94 +232,7 @@ if query_button:
                     st.subheader("\U0001F4C8 Flowchart Visualization")
 
                     # Create HTML wrapper with svg-pan-zoom library
-                    html_with_controls = f"""
-                    <!DOCTYPE html>
-                    <html>
-                    <head>
-                        <script src="https://cdn.jsdelivr.net/npm/svg-pan-zoom@3.6.1/dist/svg-pan-zoom.min.js"></script>
-                        <style>
-                            body {{
-                                margin: 0;
-                                padding: 0;
-                                overflow: hidden;
-                            }}
-                            #svg-container {{
-                                width: 100%;
-                                height: 100vh;
-                                border: 1px solid #ddd;
-                                background: #f9f9f9;
-                            }}
-                            .controls {{
-                                position: absolute;
-                                top: 10px;
-                                right: 10px;
-                                background: white;
-                                padding: 10px;
-                                border-radius: 5px;
-                                box-shadow: 0 2px 5px rgba(0,0,0,0.2);
-                                z-index: 1000;
-                            }}
-                            .controls button {{
-                                margin: 2px;
-                                padding: 8px 12px;
-                                border: 1px solid #ccc;
-                                background: white;
-                                cursor: pointer;
-                                border-radius: 3px;
-                                font-size: 14px;
-                            }}
-                            .controls button:hover {{
-                                background: #f0f0f0;
-                            }}
-                            .controls button:active {{
-                                background: #e0e0e0;
-                            }}
-                        </style>
-                    </head>
-                    <body>
-                        <div class="controls">
-                            <button onclick="panZoomInstance.zoomIn()" title="Zoom In">🔍+</button>
-                            <button onclick="panZoomInstance.zoomOut()" title="Zoom Out">🔍−</button>
-                            <button onclick="panZoomInstance.resetZoom()" title="Reset Zoom">↺ Reset</button>
-                            <button onclick="panZoomInstance.fit()" title="Fit to Screen">⛶ Fit</button>
-                            <button onclick="panZoomInstance.center()" title="Center">⊙ Center</button>
-                        </div>
-                        <div id="svg-container">
-                            {svg_output}
-                        </div>
-                        <script>
-                            // Initialize svg-pan-zoom
-                            var panZoomInstance = svgPanZoom('#svg-container svg', {{
-                                zoomEnabled: true,
-                                controlIconsEnabled: false,
-                                fit: true,
-                                center: true,
-                                minZoom: 0.1,
-                                maxZoom: 10,
-                                zoomScaleSensitivity: 0.3,
-                                dblClickZoomEnabled: true,
-                                mouseWheelZoomEnabled: true,
-                                preventMouseEventsDefault: true
-                            }});
-
-                            // Keyboard shortcuts
-                            document.addEventListener('keydown', function(e) {{
-                                if (e.key === '+' || e.key === '=') {{
-                                    panZoomInstance.zoomIn();
-                                }} else if (e.key === '-' || e.key === '_') {{
-                                    panZoomInstance.zoomOut();
-                                }} else if (e.key === '0') {{
-                                    panZoomInstance.resetZoom();
-                                }} else if (e.key === 'f') {{
-                                    panZoomInstance.fit();
-                                }} else if (e.key === 'c') {{
-                                    panZoomInstance.center();
-                                }}
-                            }});
-                        </script>
-                    </body>
-                    </html>
-                    """
+                    html_with_controls = pan_zoom_html(svg_output)
 
                     st.components.v1.html(html_with_controls, height=800, scrolling=False)
 
@@ -223,7 +259,7 @@ with st.expander("\U0001F4A1 How to Use"):
     ### Steps:
     1. **Enter Correlation ID**: Paste the correlation ID you want to analyze
     2. **Select Repository**: Choose between `sb-demo` (DEMO) or `sb-production` (PROD)
-    3. **Choose Time Range**: Select how far back to search (3 hours to 30 days)
+    3. **Choose Time Range**: Select how far back to search (3 hours to 30 days), or `auto` to widen the search until the trace is found
     4. **Pick a Theme**: Select your preferred visual theme for the flowchart
     5. **Click Generate**: The flowchart will be displayed below
 
@@ -232,6 +268,7 @@ with st.expander("\U0001F4A1 How to Use"):
     - **Download**: Save the SVG file for offline viewing or documentation
     - **Multiple Themes**: 11 different visual themes to choose from
     - **Real-time Queries**: Directly queries Humio API for fresh data
+    - **Live Mode**: Follow an in-flight transaction as new events arrive
 
     ### Requirements:
     - Valid `HUMIO_TOKEN` in `.env` file
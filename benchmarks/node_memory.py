@@ -0,0 +1,69 @@
+"""
+Memory benchmark for Node construction.
+
+Compares the slotted, lazily derived Node against the previous representation,
+a plain object with a per-instance __dict__ whose derived fields were all
+computed in __init__.
+
+Usage:
+    python -m benchmarks.node_memory [event_count]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import humanize
+
+from log_to_graph.flowchart.node import node_factory
+
+
+class DictNode:
+    """The Node layout before __slots__: every field eager, stored in __dict__."""
+
+    def __init__(self, event: dict):
+        components = event["class"].split(".")
+        self.className = components[-1]
+        self.packageName = ".".join(components[:-1])
+        self.level = event.get("level", "INFO")
+        self.timestamp = event["@timestamp"]
+        dt = datetime.fromtimestamp(self.timestamp / 1000.0)
+        self.relative_time = f"{humanize.precisedelta(datetime.now() - dt)} ago"
+        self.message = event["message"]
+        self.service = event["service"]
+        self.group = event["engineering_group"].lower()
+        self.correlation_id = event["correlation_id"]
+
+
+def make_events(count: int) -> list:
+    with open("example_event.json") as f:
+        template = json.load(f)
+    # Fresh strings per event, as they would come out of the JSON decoder
+    return [
+        json.loads(json.dumps(dict(template, **{"@timestamp": template["@timestamp"] + i})))
+        for i in range(count)
+    ]
+
+
+def measure(build, events) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    nodes = [build(event) for event in events]
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return nodes, current, elapsed
+
+
+def main(count: int):
+    events = make_events(count)
+    for name, build in (("dict (old)", DictNode), ("slots (new)", node_factory)):
+        nodes, size, elapsed = measure(build, events)
+        print(f"{name:12} {len(nodes):>7} nodes  {size / 1024 / 1024:8.2f} MiB  "
+              f"{size / len(nodes):7.1f} B/node  {elapsed:6.3f} s")
+        del nodes
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,57 @@
+"""
+Benchmark for building nodes serially versus on a process pool.
+
+A pool only pays off when building an event's node costs more than shipping
+the event to a worker and the finished node back. This measures both sides
+per event, then times node_factory_many against node_factory_parallel on a
+long-lived pool at a few sizes.
+
+Usage:
+    python -m benchmarks.node_parallel [workers]
+"""
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.node_memory import make_events
+from log_to_graph.flowchart.node import NODE_FIELDS, node_factory_many, node_factory_parallel, project_event
+
+SIZES = (10_000, 50_000, 100_000)
+
+
+def timed(function, *args) -> tuple:
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def round_trip(value) -> float:
+    started = time.perf_counter()
+    pickle.loads(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return time.perf_counter() - started
+
+
+def main(workers: int):
+    # Events as the sources hand them over, trimmed to the fields nodes read
+    events = [project_event(event, NODE_FIELDS) for event in make_events(max(SIZES))]
+
+    nodes, build = timed(node_factory_many, events)
+    transfer = round_trip(events) + round_trip(nodes)
+    print(f"per event: build {build / len(events) * 1e6:6.1f} us, "
+          f"transfer to and from a worker {transfer / len(events) * 1e6:6.1f} us")
+    del nodes
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Warm the pool up so worker start-up is not counted
+        node_factory_parallel(events[:workers * 100], executor=pool, workers=workers, threshold=0)
+        for size in SIZES:
+            chunk = events[:size]
+            _, serial = timed(node_factory_many, chunk)
+            _, parallel = timed(lambda: node_factory_parallel(chunk, executor=pool, workers=workers, threshold=0))
+            print(f"{size:>7} events  serial {serial:6.3f} s  pool of {workers} {parallel:6.3f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1)
@@ -3,8 +3,10 @@
 # This package contains modules for analyzing and visualizing log data
 # from Humio repositories as interactive flowcharts.
 
-from .humio import query_logs
+from .humio import query_logs, query_logs_batch, iter_events, iter_events_batch, async_query_logs
+from .source import EventSource, HumioEventSource, FileEventSource
 from .flowchart import FlowChart, node_factory
+from .render import RenderCache, default_render_cache
 from .flowchart import (
     LIGHT_THEME, 
     UNICORN_THEME, 
@@ -25,8 +27,17 @@ __description__ = "Log analysis and flowchart visualization for Humio data"
 
 __all__ = [
     "query_logs",
+    "iter_events",
+    "query_logs_batch",
+    "iter_events_batch",
+    "async_query_logs",
+    "EventSource",
+    "HumioEventSource",
+    "FileEventSource",
     "FlowChart", 
     "node_factory",
+    "RenderCache",
+    "default_render_cache",
     "LIGHT_THEME",
     "UNICORN_THEME", 
     "HOTDOG_THEME", 
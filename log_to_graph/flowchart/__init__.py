@@ -1,10 +1,22 @@
 from .flowchart import *
-from .node import node_factory
+from .node import node_factory, node_factory_many, node_factory_parallel, register_node, NodeBatch
+from .edges import EdgeStats, aggregate_edges, aggregate_transitions
+from .layout import Layout, LayoutPolicy, DEFAULT_LAYOUT_POLICY
 from .theme import *
 
 __all__ = [
     'FlowChart', 
     'node_factory',
+    'node_factory_many',
+    'node_factory_parallel',
+    'register_node',
+    'NodeBatch',
+    'EdgeStats',
+    'aggregate_edges',
+    'aggregate_transitions',
+    'Layout',
+    'LayoutPolicy',
+    'DEFAULT_LAYOUT_POLICY',
     'Theme', 
     'DEFAULT_THEME',
     'LIGHT_THEME',
@@ -0,0 +1,85 @@
+import math
+from typing import Iterable, List, Sequence
+
+class EdgeStats:
+    """
+    One transition between two graph nodes, with every time it was taken.
+
+    Nodes share a graph node when they have the same id, so a class that logs
+    repeatedly produces the same (source, target) pair over and over. Those
+    visits are folded into a single EdgeStats holding the visit count and the
+    latency, in milliseconds, between the two events.
+    """
+    __slots__ = ("source", "target", "count", "min_latency", "max_latency", "total_latency")
+
+    def __init__(self, source: str, target: str):
+        self.source = source
+        self.target = target
+        self.count = 0
+        self.min_latency = math.inf
+        self.max_latency = -math.inf
+        self.total_latency = 0.0
+
+    def add(self, latency: float):
+        self.count += 1
+        self.total_latency += latency
+        if latency < self.min_latency:
+            self.min_latency = latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.count if self.count else 0.0
+
+    def label(self) -> str:
+        if self.count == 1:
+            return format_latency(self.min_latency)
+        return (f"×{self.count}\n"
+                f"min {format_latency(self.min_latency)} "
+                f"avg {format_latency(self.avg_latency)} "
+                f"max {format_latency(self.max_latency)}")
+
+    def penwidth(self) -> str:
+        # Heavier lines for busier transitions, capped so hot loops don't swamp the chart
+        return f"{min(1.0 + math.log2(self.count), 5.0):g}"
+
+def format_latency(milliseconds: float) -> str:
+    if milliseconds < 1000:
+        return f"{milliseconds:.0f}ms"
+    if milliseconds < 60_000:
+        return f"{milliseconds / 1000:.1f}s"
+    return f"{milliseconds / 60_000:.1f}m"
+
+def aggregate_edges(edges: Iterable[tuple]) -> List[EdgeStats]:
+    """
+    Merge the (node, node) pairs of a chart into one EdgeStats per distinct pair of ids.
+
+    :param edges: Consecutive node pairs, as built by ``FlowChart``.
+    :return: The aggregated edges, in the order each transition was first taken.
+    """
+    aggregated: dict = {}
+    for vert_1, vert_2 in edges:
+        key = (vert_1.getId(), vert_2.getId())
+        stats = aggregated.get(key)
+        if stats is None:
+            stats = aggregated[key] = EdgeStats(*key)
+        stats.add(vert_2.timestamp - vert_1.timestamp)
+    return list(aggregated.values())
+
+def aggregate_transitions(ids: Sequence[str], timestamps: Sequence[float]) -> List[EdgeStats]:
+    """
+    Same as ``aggregate_edges``, for the node ids and timestamps of a trace in timestamp order.
+
+    :param ids: Graph node id of every event.
+    :param timestamps: Timestamp of every event, in milliseconds.
+    :return: The aggregated edges, in the order each transition was first taken.
+    """
+    aggregated: dict = {}
+    for i in range(len(ids) - 1):
+        key = (ids[i], ids[i + 1])
+        stats = aggregated.get(key)
+        if stats is None:
+            stats = aggregated[key] = EdgeStats(*key)
+        stats.add(timestamps[i + 1] - timestamps[i])
+    return list(aggregated.values())
@@ -1,8 +1,22 @@
+import zlib
+from datetime import datetime
+from functools import lru_cache
 from graphviz import Digraph
-from typing import List
+from typing import List, Optional, Tuple, Union
 from .node.node import Node
+from .node.batch import NodeBatch
+from .node.relative_time import RelativeTimeFormatter, DEFAULT_RESOLUTION
+from .edges import aggregate_edges, aggregate_transitions
+from .layout import Layout, LayoutPolicy, DEFAULT_LAYOUT_POLICY
 from .theme import Theme, DEFAULT_THEME
 
+# Palette slot for a group or service name. crc32 gives the same slot in every
+# process, unlike hash() which is salted per interpreter, so a trace always
+# renders in the same colours and identical charts produce identical output.
+@lru_cache(maxsize=4096)
+def _palette_index(name: str, palette_size: int) -> int:
+    return zlib.crc32(name.encode("utf-8")) % palette_size
+
 class FlowChart:
     # Gets a list of nodes, sort it by timestamp and returns a list of tuples [Node, Node] like
     # [(Node1, Node2), (Node2, Node3), and so on]
@@ -14,20 +28,178 @@ class FlowChart:
             edges.append((logs[i], logs[i + 1]))
         return edges
 
-    def __init__(self, correlation_id: str, nodes: List[Node], theme: Theme = DEFAULT_THEME):
+    # now is the single reference time for every node's relative_time, and
+    # formatted deltas are shared per time_resolution seconds; humanize_output=False
+    # uses a cheap "<seconds>s ago" instead. A prepared time_formatter can be
+    # passed instead of those three. Relative times are only formatted when a
+    # node's relative_time is read, and relative_times=False leaves the nodes alone.
+    # With aggregate, repeated transitions between the same two graph nodes are
+    # drawn as one edge labelled with its count and latencies, instead of one
+    # edge per consecutive pair of events.
+    # layout_policy picks the engine, edge routing and unflatten settings from
+    # the size of the chart; pass a LayoutPolicy to change its thresholds.
+    # Given a NodeBatch, the chart is sorted, clustered and its edges counted on
+    # the batch's columns, and rendering only builds the Node objects it draws
+    # (see _add_node); nodes and edges are built when they are first read.
+    def __init__(self, correlation_id: str, nodes: Union[List[Node], NodeBatch], theme: Theme = DEFAULT_THEME,
+                 now: Optional[datetime] = None,
+                 time_resolution: float = DEFAULT_RESOLUTION,
+                 relative_times: bool = True,
+                 humanize_output: bool = True,
+                 time_formatter: Optional[RelativeTimeFormatter] = None,
+                 aggregate: bool = True,
+                 layout_policy: LayoutPolicy = DEFAULT_LAYOUT_POLICY):
         self.correlation_id = correlation_id
-        self.edges = self._get_edges(nodes)
-        self.nodes = nodes
-        self.start = nodes[0]
-        self.end = nodes[-1]
+        self.aggregate = aggregate
+        self.layout_policy = layout_policy
         self.theme = theme
+        if not relative_times:
+            self.time_formatter = None
+        elif time_formatter is not None:
+            self.time_formatter = time_formatter
+        else:
+            self.time_formatter = RelativeTimeFormatter(now, time_resolution, humanize_output)
+        self._batch: Optional[NodeBatch] = None
+        self._nodes: Optional[List[Node]] = None
+        self._edges: Optional[List[tuple]] = None
+        if isinstance(nodes, NodeBatch):
+            self._batch = nodes.sorted()
+        else:
+            self._set_nodes(nodes)
+
+    def _set_nodes(self, nodes: List[Node]):
+        if self.time_formatter is not None:
+            self.time_formatter.attach(nodes)
+        self._edges = self._get_edges(nodes)
+        self._nodes = nodes
+
+    @property
+    def nodes(self) -> List[Node]:
+        if self._nodes is None:
+            self._set_nodes(self._batch.nodes())
+        return self._nodes
+
+    @property
+    def edges(self) -> List[tuple]:
+        if self._edges is None:
+            self._set_nodes(self.nodes)
+        return self._edges
+
+    @property
+    def start(self) -> Node:
+        return self._node(0) if self._nodes is None else self._nodes[0]
+
+    @property
+    def end(self) -> Node:
+        return self._node(len(self._batch) - 1) if self._nodes is None else self._nodes[-1]
+
+    # Adds nodes to an existing chart, e.g. events arriving from a live query,
+    # and recomputes the edges and start/end nodes.
+    def add_nodes(self, nodes: List[Node]):
+        if not nodes:
+            return
+        all_nodes = self.nodes
+        if self.time_formatter is not None:
+            self.time_formatter.attach(nodes)
+        all_nodes.extend(nodes)
+        self._edges = self._get_edges(all_nodes)
+        # From here on the chart is kept as nodes
+        self._batch = None
+
+    # The Node for a visit, which is a node or, while the chart is a batch, a row of it
+    def _node(self, visit) -> Node:
+        if self._nodes is not None:
+            return visit
+        node = self._batch.node(visit)
+        if self.time_formatter is not None:
+            node.relative_time = self.time_formatter
+        return node
+
+    def _level(self, visit) -> str:
+        return visit.level if self._nodes is not None else self._batch.level(visit)
+
+    def _visit_clusters(self) -> dict:
+        return self._get_clusters(self._nodes) if self._nodes is not None else self._batch.clusters()
+
+    def _visit_ids(self) -> tuple:
+        # Ids of the first and last visits
+        if self._nodes is not None:
+            return self._nodes[0].getId(), self._nodes[-1].getId()
+        return self._batch.node_id(0), self._batch.node_id(len(self._batch) - 1)
+
+    # EdgeStats per transition with aggregate, else (source id, target id) per consecutive pair
+    def _transitions(self) -> list:
+        if self._nodes is not None:
+            if self.aggregate:
+                return aggregate_edges(self._edges)
+            return [(vert_1.getId(), vert_2.getId()) for vert_1, vert_2 in self._edges]
+        batch = self._batch
+        ids = [batch.node_id(row) for row in range(len(batch))]
+        if self.aggregate:
+            return aggregate_transitions(ids, batch.timestamps)
+        return list(zip(ids, ids[1:]))
+
+    # Nodes grouped as {group: {service: {id: [nodes]}}}, each keeping the order
+    # the nodes first appear in, so every cluster and graph node is declared once
+    @staticmethod
+    def _get_clusters(nodes: List[Node]) -> dict:
+        clusters: dict = {}
+        for node in nodes:
+            clusters.setdefault(node.group, {}).setdefault(node.service, {}).setdefault(node.getId(), []).append(node)
+        return clusters
+
+    # Declares one graph node for all the visits to it. The last visit sets its
+    # outline, the latest visit that has a note provides it, and the last ERROR
+    # and last WARN visits provide the stacktrace notes, which is what repeated
+    # declarations used to end up with. Only those visits' Nodes are needed,
+    # and classes without their own addNote don't look past the last visit.
+    def _add_node(self, visits: list, graph: Digraph, subgraph: Digraph):
+        last = self._node(visits[-1])
+        last.addVertex(self.theme, subgraph)
+        if type(last).addNote is Node.addNote:
+            visits_with_notes = ()
+        else:
+            visits_with_notes = reversed(visits)
+        for visit in visits_with_notes:
+            emitted = len(graph.body)
+            self._node(visit).addNote(self.theme, graph)
+            if len(graph.body) != emitted:
+                break
+        for level in ("ERROR", "WARN"):
+            for visit in reversed(visits):
+                if self._level(visit) == level:
+                    self._node(visit).addLevelNote(self.theme, graph, subgraph)
+                    break
 
     def _get_subgraph_colors(self, service, color_scheme):
-      index = hash(service) % len(color_scheme)  # Use hash to distribute colors
-      return color_scheme[index]
+      return color_scheme[_palette_index(service, len(color_scheme))]
+
+    def _choose_layout(self, clusters: dict, edge_count: int) -> Layout:
+        node_count = len({node_id for services in clusters.values() for ids in services.values() for node_id in ids})
+        cluster_count = len(clusters) + sum(len(services) for services in clusters.values())
+        return self.layout_policy.choose(node_count, edge_count, cluster_count)
 
-    def to_graphviz(self):
-        dot = Digraph(format='svg', engine='dot', graph_attr={'splines':'ortho'})
+    # The layout the policy picks for this chart in its current state
+    def layout(self) -> Layout:
+        return self._choose_layout(self._visit_clusters(), len(self._transitions()))
+
+    # With unflatten, the graph is passed through Graphviz's unflatten with the
+    # layout's settings, which needs the unflatten binary and returns a Source
+    def to_graphviz(self, unflatten: bool = False):
+        dot, layout = self.to_graphviz_with_layout()
+        if unflatten and layout.unflatten is not None:
+            return dot.unflatten(**layout.unflatten)
+        return dot
+
+    # The graph and the layout chosen for it, e.g. to hand layout.unflatten to
+    # RenderPool so unflatten runs in the pool, after its cache lookup
+    def to_graphviz_with_layout(self) -> Tuple[Digraph, Layout]:
+        clusters = self._visit_clusters()
+        edges = self._transitions()
+        start_id, end_id = self._visit_ids()
+        layout = self._choose_layout(clusters, len(edges))
+        dot = Digraph(format='svg', engine=layout.engine,
+                      graph_attr={'splines': layout.splines, **layout.graph_attr})
 
         # Set the title and attributes for the graph
         dot.attr(label=f'Correlation ID: {self.correlation_id}',
@@ -70,25 +242,34 @@ class FlowChart:
                  fontcolor=self.theme.end.fontcolor)
   
         # Add start connection
-        dot.edge('S', str(self.start.getId()))
+        dot.edge('S', start_id)
 
-        self.start.addToGraph(self.theme, dot, dot)  # type: ignore
-        for node in self.nodes:
-          with dot.subgraph(name=f'cluster_{node.group}') as group: # type: ignore
-            bgcolor, line_color = self._get_subgraph_colors(node.group, self.theme.group_colors)
+        for group_name, services in clusters.items():
+          with dot.subgraph(name=f'cluster_{group_name}') as group: # type: ignore
+            bgcolor, line_color = self._get_subgraph_colors(group_name, self.theme.group_colors)
             group.attr(bgcolor=bgcolor, color=line_color, fontcolor=line_color)
-            group.attr(label=node.group)
-            with group.subgraph(name=f'cluster_{node.service}') as sub: # type: ignore
-                bgcolor, line_color = self._get_subgraph_colors(node.service, self.theme.service_colors)
-                sub.attr(label=node.service, bgcolor=bgcolor, color=line_color, fontcolor=line_color)
-                node.addToGraph(self.theme, dot, sub)
+            group.attr(label=group_name)
+            for service, nodes in services.items():
+                with group.subgraph(name=f'cluster_{service}') as sub: # type: ignore
+                    bgcolor, line_color = self._get_subgraph_colors(service, self.theme.service_colors)
+                    sub.attr(label=service, bgcolor=bgcolor, color=line_color, fontcolor=line_color)
+                    for visits in nodes.values():
+                        self._add_node(visits, dot, sub)
 
-        for vert_1, vert_2 in self.edges:
-            dot.edge(str(vert_1.getId()), str(vert_2.getId()))
+        if self.aggregate:
+            # Only repeated transitions are annotated. xlabel is placed after
+            # layout, so it works with ortho splines and doesn't add label
+            # nodes to the ranking the way label does
+            for edge in edges:
+                if edge.count > 1:
+                    dot.edge(edge.source, edge.target, xlabel=edge.label(), penwidth=edge.penwidth())
+                else:
+                    dot.edge(edge.source, edge.target)
+        else:
+            for source, target in edges:
+                dot.edge(source, target)
 
-        self.end.addToGraph(self.theme, dot, dot)
         # Add end connection
-        dot.edge(str(self.end.getId()), 'E')
-
-        return dot
+        dot.edge(end_id, 'E')
+        return dot, layout
 
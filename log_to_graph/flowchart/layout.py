@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+@dataclass(frozen=True)
+class Layout:
+    engine: str  # Graphviz layout engine
+    splines: str  # Edge routing
+    unflatten: Optional[dict] = None  # Keyword arguments for graphviz's unflatten(), None to skip it
+    graph_attr: dict = field(default_factory=dict)  # Extra graph attributes
+
+@dataclass(frozen=True)
+class LayoutPolicy:
+    """
+    Picks the layout for a chart from its size.
+
+    Orthogonal edge routing looks best but its cost grows quickly with the
+    number of nodes, edges and clusters, so only small charts get it.
+    Medium charts are routed as polylines, and large ones with straight lines
+    and capped dot iterations so they still lay out in seconds. A chart is
+    small or medium only while it is within every threshold of that tier.
+    """
+    ortho_max_nodes: int = 60  # Graph nodes, i.e. distinct node ids
+    ortho_max_edges: int = 150  # Edges after aggregation
+    ortho_max_clusters: int = 20  # Group and service clusters
+    polyline_max_nodes: int = 400
+    polyline_max_edges: int = 1500
+    polyline_max_clusters: int = 100
+    engine: str = "dot"  # Engine for small and medium charts
+    large_engine: str = "dot"  # Engine for large charts
+    # unflatten() arguments for small and medium charts: staggering leaves and
+    # chains spreads out wide, flat charts
+    small_unflatten: Optional[dict] = field(default_factory=lambda: {"stagger": 3})
+    medium_unflatten: Optional[dict] = field(default_factory=lambda: {"stagger": 5, "fanout": True, "chain": 5})
+    # Bound dot's crossing minimisation and ranking passes on large charts
+    large_graph_attr: dict = field(default_factory=lambda: {"mclimit": "0.3", "nslimit": "2", "nslimit1": "2"})
+
+    def choose(self, nodes: int, edges: int, clusters: int) -> Layout:
+        if nodes <= self.ortho_max_nodes and edges <= self.ortho_max_edges and clusters <= self.ortho_max_clusters:
+            return Layout(self.engine, "ortho", self.small_unflatten)
+        if nodes <= self.polyline_max_nodes and edges <= self.polyline_max_edges and clusters <= self.polyline_max_clusters:
+            return Layout(self.engine, "polyline", self.medium_unflatten)
+        return Layout(self.large_engine, "line", None, dict(self.large_graph_attr))
+
+DEFAULT_LAYOUT_POLICY = LayoutPolicy()
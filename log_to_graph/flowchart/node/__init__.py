@@ -1,7 +1,30 @@
-from .node_factory import node_factory
-from .node import Node
+from .node_factory import node_factory, node_factory_many
+from .registry import register_node, resolve_node_class
+from .node import Node, NODE_FIELDS, project_event
+from .batch import NodeBatch
+from .relative_time import RelativeTimeFormatter
+from .notes import NoteEngine, NOTE_ENGINE, note_pattern
+from .stacktrace import StacktraceCondenser, DEFAULT_CONDENSER
+from .symbols import SymbolTable, SYMBOLS
+from .parallel import node_factory_parallel, PARALLEL_THRESHOLD
 
 __all__ = [
     "node_factory",
-    "Node"
+    "node_factory_many",
+    "register_node",
+    "resolve_node_class",
+    "Node",
+    "NODE_FIELDS",
+    "project_event",
+    "NodeBatch",
+    "RelativeTimeFormatter",
+    "NoteEngine",
+    "NOTE_ENGINE",
+    "note_pattern",
+    "StacktraceCondenser",
+    "DEFAULT_CONDENSER",
+    "SymbolTable",
+    "SYMBOLS",
+    "node_factory_parallel",
+    "PARALLEL_THRESHOLD"
 ]
\ No newline at end of file
@@ -1,15 +1,18 @@
-import re
 from graphviz import Digraph
 from .node import Node
+from .notes import note_pattern
+from .registry import register_node
 from ..theme.theme import Theme
 # Auth request declined for Message: MC-20250904-MDHLO8D2J, response code: Code 05 "Do not honor" , decline reason: TRACK_DATA_INVALID
+@register_node("com.starlingbank.cardprocessor.workflow.auth.handlers.AuthDeclineHandler")
+@note_pattern("decline", r'Auth request declined for Message: ([\w-]+), response code: Code (\d+) \"([^"]+)\"')
 class AuthDeclineHandler(Node):
+    __slots__ = ()
+
     def addNote(self, theme: Theme, graph: Digraph):
-        match = re.search(r'Auth request declined for Message: ([\w-]+), response code: Code (\d+) \"([^"]+)\"', self.message)
-        if match :
-            message_id = match.group(1)
-            response_code = match.group(2)
-            response_reason = match.group(3)
+        decline = self.notes.get("decline")
+        if decline :
+            message_id, response_code, response_reason = decline
             formatted_message = f"Message ID: {message_id}\nResponse Code: {response_code}\nReason: {response_reason}"
             graph.node(f'{self.getId()}_message',
                         label=formatted_message,
@@ -1,20 +1,36 @@
 from graphviz import Digraph
 from .dtopp import dto_pp
 from .node import Node
+from .registry import register_node
 from ..theme.theme import Theme
 
 
+@register_node("com.starlingbank.cardprocessor.workflow.auth.handlers.AuthRequestSaveHandler")
 class AuthRequestSaveHandler(Node):
+    # The formatted DTO is kept once computed, re-rendering the node reuses it
+    __slots__ = ("_dto",)
+
+    def __init__(self, event: dict):
+        super().__init__(event)
+        self._dto = None
+
+    def dto(self):
+        if self._dto is None:
+            # "" marks a message without a DTO so it is not searched again
+            self._dto = dto_pp(self.message) or ""
+        return self._dto
+
     def addNote(self, theme: Theme, graph: Digraph):
-        pass
-        # message = dto_pp(self.message)
-        # graph.node(f'{self.getId()}_message',
-        #             label=message,
-        #             shape=theme.info_note.shape, 
-        #             style=theme.info_note.style,
-        #             fillcolor=theme.info_note.fillcolor,
-        #             fontname=theme.info_note.fontname, 
-        #             fontsize=theme.info_note.fontsize,
-        #             fontcolor=theme.info_note.fontcolor,
-        #             labelloc='l')
-        # graph.edge(str(self.getId()), f'{self.getId()}_message', color=theme.info_edge.color, style=theme.info_edge.style)
\ No newline at end of file
+        message = self.dto()
+        if not message:
+            return
+        graph.node(f'{self.getId()}_message',
+                    label=message + '\\l',
+                    shape=theme.info_note.shape, 
+                    style=theme.info_note.style,
+                    fillcolor=theme.info_note.fillcolor,
+                    fontname=theme.info_note.fontname, 
+                    fontsize=theme.info_note.fontsize,
+                    fontcolor=theme.info_note.fontcolor,
+                    labelloc='l')
+        graph.edge(str(self.getId()), f'{self.getId()}_message', color=theme.info_edge.color, style=theme.info_edge.style)
@@ -0,0 +1,151 @@
+from array import array
+from typing import Iterable, List, Optional
+from .node import Node
+from .node_factory import node_factory
+from .symbols import SYMBOLS
+
+class _Dictionary:
+    """
+    Dictionary encoding for a string column: each distinct value gets a small integer code.
+    """
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+class NodeBatch:
+    """
+    Columnar container for the events of a trace.
+
+    Timestamps live in a flat ``array`` and service, class, level and group are
+    stored as dictionary-encoded integer codes, so sorting, node ids, clusters,
+    edge construction and level filtering work on compact columns instead of
+    one Python object per event. Node objects are only built, via
+    ``node_factory``, when asked for; ``FlowChart`` asks for a few per graph node.
+    """
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.service_codes = array("I")
+        self.class_codes = array("I")
+        self.level_codes = array("I")
+        self.group_codes = array("I")
+        self.services = _Dictionary()
+        self.classes = _Dictionary()
+        self.levels = _Dictionary()
+        self.groups = _Dictionary()
+        self.events: List[dict] = []
+        self._nodes: List[Optional[Node]] = []
+        # Node id per (service code, class code), shared with batches taken from this one
+        self._ids: dict = {}
+
+    @classmethod
+    def from_events(cls, events: Iterable[dict]) -> 'NodeBatch':
+        batch = cls()
+        batch.extend(events)
+        return batch
+
+    def extend(self, events: Iterable[dict]):
+        for event in events:
+            self.timestamps.append(event["@timestamp"])
+            self.service_codes.append(self.services.encode(event["service"]))
+            # "" stands for events without a class, which Node reports as Unknown
+            self.class_codes.append(self.classes.encode(event.get("class", "")))
+            self.level_codes.append(self.levels.encode(event.get("level", "INFO")))
+            self.group_codes.append(self.groups.encode(event["engineering_group"]))
+            self.events.append(event)
+            self._nodes.append(None)
+
+    def __len__(self):
+        return len(self.events)
+
+    def _take(self, rows: List[int]) -> 'NodeBatch':
+        # New batch with the given rows, sharing the dictionaries and any nodes already built
+        batch = NodeBatch()
+        batch.services = self.services
+        batch.classes = self.classes
+        batch.levels = self.levels
+        batch.groups = self.groups
+        batch._ids = self._ids
+        batch.timestamps = array("d", [self.timestamps[i] for i in rows])
+        batch.service_codes = array("I", [self.service_codes[i] for i in rows])
+        batch.class_codes = array("I", [self.class_codes[i] for i in rows])
+        batch.level_codes = array("I", [self.level_codes[i] for i in rows])
+        batch.group_codes = array("I", [self.group_codes[i] for i in rows])
+        batch.events = [self.events[i] for i in rows]
+        batch._nodes = [self._nodes[i] for i in rows]
+        return batch
+
+    def is_sorted(self) -> bool:
+        timestamps = self.timestamps
+        return all(timestamps[i] <= timestamps[i + 1] for i in range(len(timestamps) - 1))
+
+    def sorted(self) -> 'NodeBatch':
+        """
+        Return the batch ordered by timestamp; ties keep their arrival order.
+        """
+        if self.is_sorted():
+            return self
+        return self._take(sorted(range(len(self)), key=self.timestamps.__getitem__))
+
+    def filter_levels(self, levels: Iterable[str]) -> 'NodeBatch':
+        """
+        Return the rows whose level is one of ``levels``.
+        """
+        wanted = {self.levels.codes[level] for level in levels if level in self.levels.codes}
+        return self._take([i for i, code in enumerate(self.level_codes) if code in wanted])
+
+    def edges(self) -> List[tuple]:
+        """
+        Row index pairs linking each event to the next one, like ``FlowChart._get_edges``
+        on a batch that is already sorted.
+        """
+        return list(zip(range(len(self) - 1), range(1, len(self))))
+
+    def level(self, row: int) -> str:
+        return self.levels.values[self.level_codes[row]]
+
+    def node_id(self, row: int) -> str:
+        """
+        The id ``Node.getId`` returns for the row, without building the node.
+        """
+        key = (self.service_codes[row], self.class_codes[row])
+        node_id = self._ids.get(key)
+        if node_id is None:
+            qualified_name = self.classes.values[key[1]]
+            class_name = SYMBOLS.class_name(qualified_name)[1] if qualified_name else "Unknown"
+            node_id = self._ids[key] = SYMBOLS.node_id(SYMBOLS.intern(self.services.values[key[0]]), class_name)
+        return node_id
+
+    def clusters(self) -> dict:
+        """
+        Row numbers grouped as ``{group: {service: {node id: [rows]}}}``, like ``FlowChart`` groups nodes.
+        """
+        clusters: dict = {}
+        groups = [SYMBOLS.group(group) for group in self.groups.values]
+        services = self.services.values
+        for row in range(len(self)):
+            (clusters.setdefault(groups[self.group_codes[row]], {})
+                     .setdefault(services[self.service_codes[row]], {})
+                     .setdefault(self.node_id(row), [])
+                     .append(row))
+        return clusters
+
+    def node(self, row: int) -> Node:
+        node = self._nodes[row]
+        if node is None:
+            node = node_factory(self.events[row])
+            self._nodes[row] = node
+        return node
+
+    def nodes(self) -> List[Node]:
+        return [self.node(row) for row in range(len(self))]
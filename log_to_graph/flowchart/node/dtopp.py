@@ -4,45 +4,97 @@ from typing import Optional
 # Util method to extrat the string representation of a DTO from a log message
 # and format it for better readability
 
+# Upper bound for the formatted output, longer DTOs are cut with an ellipsis
+DEFAULT_MAX_LENGTH = 4000
+# Nesting deeper than this is collapsed to {...}
+DEFAULT_MAX_DEPTH = 6
+
+_DTO_PATTERN = re.compile(r'(\w*{.*})')
+_INDENT = 4
+# Graphviz left-justified line break
+_NEWLINE = '\\l'
+_ELLIPSIS = '...'
+
 def __extract_dto_from_log(message: str) -> Optional[str]:
-    match = re.search(r'(\w*{.*})', message)
+    match = _DTO_PATTERN.search(message)
     if match:
-        extracted_message = match.group(1)
-        return __format_message(extracted_message)
+        return match.group(1)
     return None
 
-def __format_message(message: str) -> Optional[str]:
-    def format_message_inner(message: str, tabsize, acc) -> str:
-        if message.__len__() == 0:
-            return acc
-        head, *tail = message
-        if head == '{':
-            acc += head + '\l' + ' ' * (tabsize + 4) 
-            return format_message_inner(''.join(tail), tabsize + 4, acc)
-        elif head == '}':
-            acc += '\l' + ' ' * (tabsize - 4) + head
-            return format_message_inner(''.join(tail), tabsize - 4, acc)
-        elif head == ',':
-            acc += head + '\l' + ' ' * tabsize
-            return format_message_inner(''.join(tail), tabsize, acc)
-        elif head == ' ':
-            return format_message_inner(''.join(tail), tabsize, acc)
+def format_dto(message: str, max_length: Optional[int] = DEFAULT_MAX_LENGTH,
+               max_depth: Optional[int] = DEFAULT_MAX_DEPTH) -> str:
+    """
+    Formats a DTO string, one field per line and nested objects indented.
+
+    Runs in a single pass over the input, so time and memory stay linear in
+    the size of the DTO regardless of how long or deeply nested it is.
+
+    Args:
+        message (str): The DTO string, e.g. ``Foo{a=1, bar=Bar{b=2}}``.
+        max_length (int): Stop after this many output characters, None for no limit.
+        max_depth (int): Collapse objects nested deeper than this, None for no limit.
+
+    Returns:
+        str: The formatted DTO using Graphviz ``\\l`` line breaks.
+    """
+    parts = []
+    length = 0
+    depth = 0
+
+    def emit(text: str) -> bool:
+        # Returns False once the output is full. A unit that doesn't fit is
+        # dropped whole, cutting it could split a \l escape.
+        nonlocal length
+        if max_length is not None and length + len(text) > max_length:
+            parts.append(_ELLIPSIS)
+            return False
+        parts.append(text)
+        length += len(text)
+        return True
+
+    for char in message:
+        collapsed = max_depth is not None and depth > max_depth
+        if char == '{':
+            depth += 1
+            if collapsed:
+                continue
+            if max_depth is not None and depth > max_depth:
+                ok = emit('{' + _ELLIPSIS)
+            else:
+                ok = emit('{' + _NEWLINE + ' ' * (depth * _INDENT))
+        elif char == '}':
+            depth -= 1
+            if max_depth is not None and depth > max_depth:
+                continue
+            if collapsed:
+                ok = emit('}')
+            else:
+                ok = emit(_NEWLINE + ' ' * (max(depth, 0) * _INDENT) + '}')
+        elif collapsed or char == ' ':
+            continue
+        elif char == ',':
+            ok = emit(',' + _NEWLINE + ' ' * (depth * _INDENT))
         else:
-            acc += head
-            return format_message_inner(''.join(tail), tabsize, acc)
-    return format_message_inner(message, 0, '')
+            ok = emit(char)
+        if not ok:
+            break
+
+    return ''.join(parts)
 
-def dto_pp(message: str) -> Optional[str]:
+def dto_pp(message: str, max_length: Optional[int] = DEFAULT_MAX_LENGTH,
+           max_depth: Optional[int] = DEFAULT_MAX_DEPTH) -> Optional[str]:
     """
     Pretty prints a DTO from a log message.
-    
+
     Args:
         message (str): The log message containing the DTO.
-        
+        max_length (int): Stop after this many output characters, None for no limit.
+        max_depth (int): Collapse objects nested deeper than this, None for no limit.
+
     Returns:
         str: The pretty printed DTO string.
     """
     dto = __extract_dto_from_log(message)
     if dto:
-        return __format_message(dto)
-    return None
\ No newline at end of file
+        return format_dto(dto, max_length, max_depth)
+    return None
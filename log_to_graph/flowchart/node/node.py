@@ -4,37 +4,79 @@ from graphviz import Digraph
 import humanize
 
 from ..theme.theme import Theme
+from .notes import NOTE_ENGINE
+from .stacktrace import DEFAULT_CONDENSER
+from .symbols import SYMBOLS
+
+# Event fields read when building a Node, everything else in a Humio event is ignored
+NODE_FIELDS = (
+    "class",
+    "level",
+    "@timestamp",
+    "message",
+    "service",
+    "engineering_group",
+    "correlation_id",
+)
+
+def project_event(event:dict, fields) -> dict:
+    """
+    Return a copy of the event with only the given fields, or the event itself if fields is empty.
+    """
+    if not fields:
+        return event
+    return {field: event[field] for field in fields if field in event}
 
 class Node:
+    # Slots keep each node free of a per-instance __dict__; the underscore slots
+    # cache derived values that are only computed when first asked for.
+    __slots__ = (
+        "className",
+        "packageName",
+        "level",
+        "timestamp",
+        "message",
+        "service",
+        "group",
+        "correlation_id",
+        "_id",
+        "_relative_time",
+        "_label",
+        "_stacktrace",
+        "_notes",
+    )
+
+    # Shortens error and warning messages for their notes; assign a
+    # StacktraceCondenser on Node or a subclass to change packages or limits
+    stacktrace_condenser = DEFAULT_CONDENSER
 
     def __init__(self, event:dict):
+        # Names repeat across every event of a trace, so they go through the
+        # shared symbol table and equal values are one string object
         if "class" in event:
-            self.className = self._class_name(event["class"])
-            self.packageName = self._package_name(event["class"])
+            self.packageName, self.className = SYMBOLS.class_name(event["class"])
         else:
             self.className = "Unknown"
             self.packageName = "unknown"
 
-        if "level" in event:
-            self.level = event["level"]
-        else:
-            self.level = "INFO"
-
+        self.level = SYMBOLS.intern(event.get("level", "INFO"))
         self.timestamp = event["@timestamp"]
-        self.relative_time = self._format_timestamp(self.timestamp)
         self.message = event["message"]
-        self.service = event["service"]
-        self.group = event["engineering_group"].lower()
+        self.service = SYMBOLS.intern(event["service"])
+        self.group = SYMBOLS.group(event["engineering_group"])
+        # Unique per trace, so not worth keeping in the process-wide table
         self.correlation_id = event["correlation_id"]
-
+        self._id = SYMBOLS.node_id(self.service, self.className)
+        self._relative_time = None
+        self._label = None
+        self._stacktrace = None
+        # Note patterns are matched once here, re-rendering reuses the result
+        self._notes = NOTE_ENGINE.extract(type(self), self.message)
 
     # Takes a Java class name and returns the class name without the package name
     @staticmethod
     def _class_name(class_name):
-        if "." in class_name:
-            components = class_name.split(".")
-            class_name = f"{components[- 1]}"
-        return class_name
+        return class_name.rpartition(".")[2]
 
     # Takes the timestamp and formats it to a human-readable format
     @staticmethod
@@ -46,36 +88,62 @@ class Node:
         # Format the difference in a human-readable way
         return f"{humanize.precisedelta(now - dt)} ago"
 
+    # Human-readable age of the event, formatted on first access. It can also be
+    # set to a RelativeTimeFormatter (see RelativeTimeFormatter.attach), which is
+    # then used for that first access instead of the current time.
+    @property
+    def relative_time(self):
+        value = self._relative_time
+        if value is None:
+            value = self._relative_time = self._format_timestamp(self.timestamp)
+        elif not isinstance(value, str):
+            value = self._relative_time = value.format(self.timestamp)
+        return value
+
+    @relative_time.setter
+    def relative_time(self, value):
+        self._relative_time = value
+
+    # Groups captured by the note patterns registered for this node's class, keyed by note name
+    @property
+    def notes(self):
+        return self._notes
+
     def getId(self):
-        return f"{self.service}_{self.className}"
+        return self._id
 
     def stacktrace(self):
-        stacktrace = []
-        for line in self.message.split("\n"):
-            if line.strip().startswith("at "):
-                if "com.starlingbank" in line:
-                    stacktrace.append(line)
-                elif len(stacktrace) > 0 and stacktrace[-1] != "...":
-                    stacktrace.append("...")
-            else:
-                stacktrace.append(line)
-        return "\n".join(stacktrace)
-
-    def _package_name(self, class_name):
-        if "." in class_name:
-            components = class_name.split(".")
-            package = ".".join(components[:-1])
-            return package
-        else:
-          return ""
+        if self._stacktrace is None:
+            self._stacktrace = self.stacktrace_condenser.condense(self.message)
+        return self._stacktrace
+
+    @staticmethod
+    def _package_name(class_name):
+        return class_name.rpartition(".")[0]
 
     def label(self):
-        return f"""<
+        if self._label is None:
+            self._label = f"""<
         <TABLE BORDER="0" CELLBORDER="0" CELLSPACING="0">
         <TR><TD ALIGN="CENTER"><FONT POINT-SIZE="8">{self.packageName}</FONT></TD></TR>
         <TR><TD ALIGN="CENTER"><FONT POINT-SIZE="10">{self.className}</FONT></TD></TR>
         </TABLE>
         >"""
+        return self._label
+
+    # Plain dict of the event fields, e.g. for JSON export; slotted nodes have no __dict__
+    def to_dict(self):
+        return {
+            "className": self.className,
+            "packageName": self.packageName,
+            "level": self.level,
+            "timestamp": self.timestamp,
+            "relative_time": self.relative_time,
+            "message": self.message,
+            "service": self.service,
+            "group": self.group,
+            "correlation_id": self.correlation_id,
+        }
 
     def __str__(self):
         return f"{self.className}"
@@ -94,7 +162,8 @@ class Node:
     def addNote(self, theme: Theme, graph: Digraph):
         pass;
 
-    def addToGraph(self, theme: Theme, graph:Digraph, subgraph: Digraph):
+    # Declares the node itself, outlined in the colour of its level
+    def addVertex(self, theme: Theme, subgraph: Digraph):
         subgraph.node(str(self.getId()), 
                     label=self.label(), 
                     shape=theme.node.shape, 
@@ -104,7 +173,9 @@ class Node:
                     fontname=theme.node.fontname, 
                     fontsize=theme.node.fontsize, 
                     fontcolor=theme.node.fontcolor)
-        self.addNote(theme, graph)
+
+    # Adds the condensed stacktrace of an ERROR or WARN event as a note
+    def addLevelNote(self, theme: Theme, graph: Digraph, subgraph: Digraph):
         if self.level == "ERROR":
             error_node_name = f"{self.getId()}_error"
             # Style the error node
@@ -122,7 +193,7 @@ class Node:
         elif self.level == "WARN":
             warn_node_name = f"{self.getId()}_warn"
             graph.node(warn_node_name,
-                        label=self.stacktrace().replace('\n', "\l"),
+                        label=self.stacktrace().replace('\n', "\\l"),
                         shape=theme.warn_note.shape, 
                         style=theme.warn_note.style, 
                         fillcolor=theme.warn_note.fillcolor,
@@ -131,4 +202,9 @@ class Node:
                         fontcolor=theme.warn_note.fontcolor,
                         labelloc='l')
             subgraph.edge(str(self.getId()), warn_node_name, color=theme.warn_edge.color, style=theme.warn_edge.style)
+
+    def addToGraph(self, theme: Theme, graph:Digraph, subgraph: Digraph):
+        self.addVertex(theme, subgraph)
+        self.addNote(theme, graph)
+        self.addLevelNote(theme, graph, subgraph)
         return graph
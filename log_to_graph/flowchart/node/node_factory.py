@@ -1,16 +1,20 @@
-from .authdeclinehandler import AuthDeclineHandler
-from .authrequestsavehandler import AuthRequestSaveHandler
+from typing import Iterable, List
 from .node import Node
-from .workflow import WorkflowManagerNode
+from .registry import resolve_node_class
+# Importing the built-in handlers registers them
+from . import authdeclinehandler, authrequestsavehandler, workflow  # noqa: F401
 
 def node_factory(event:dict) -> Node:
-    if(event.get('class') is None):
-        return Node(event)
-    if(event['class'] == 'com.starlingbank.workflow.WorkflowManager'):
-        return WorkflowManagerNode(event)
-    elif(event['class'] == 'com.starlingbank.cardprocessor.workflow.auth.handlers.AuthRequestSaveHandler'):
-        return AuthRequestSaveHandler(event)
-    elif(event['class'] == 'com.starlingbank.cardprocessor.workflow.auth.handlers.AuthDeclineHandler'):
-        return AuthDeclineHandler(event)
-    else:
-        return Node(event)
\ No newline at end of file
+    return resolve_node_class(event.get('class'))(event)
+
+# Builds the nodes for many events, resolving the handler once per distinct class
+def node_factory_many(events:Iterable[dict]) -> List[Node]:
+    handlers: dict = {}
+    nodes = []
+    for event in events:
+        class_name = event.get('class')
+        node_class = handlers.get(class_name)
+        if node_class is None:
+            node_class = handlers[class_name] = resolve_node_class(class_name)
+        nodes.append(node_class(event))
+    return nodes
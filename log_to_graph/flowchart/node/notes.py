@@ -0,0 +1,50 @@
+import re
+from typing import Callable, Type
+
+class NoteEngine:
+    """
+    Extracts note data from log messages.
+
+    Patterns are registered per Node subclass and compiled once, and the list
+    of patterns that apply to a class, including inherited ones, is resolved
+    once per class. Each pattern is searched on its own, so patterns keep
+    their usual semantics: one pattern's match never hides another's.
+    """
+
+    def __init__(self):
+        self._patterns: dict[type, list[tuple[str, re.Pattern]]] = {}
+        self._resolved: dict[type, list[tuple[str, re.Pattern]]] = {}
+
+    def register(self, node_class:type, name:str, pattern:str):
+        self._patterns.setdefault(node_class, []).append((name, re.compile(pattern)))
+        self._resolved.clear()
+
+    def _resolve(self, node_class:type) -> list[tuple[str, re.Pattern]]:
+        return [entry for cls in reversed(node_class.__mro__) for entry in self._patterns.get(cls, [])]
+
+    def extract(self, node_class:type, message:str) -> dict[str, tuple]:
+        """
+        Return the groups of the first match of every pattern registered for the class.
+        """
+        patterns = self._resolved.get(node_class)
+        if patterns is None:
+            patterns = self._resolved[node_class] = self._resolve(node_class)
+        notes: dict[str, tuple] = {}
+        for name, pattern in patterns:
+            if name in notes:
+                continue
+            match = pattern.search(message)
+            if match:
+                notes[name] = match.groups()
+        return notes
+
+NOTE_ENGINE = NoteEngine()
+
+def note_pattern(name:str, pattern:str) -> Callable[[Type], Type]:
+    """
+    Class decorator registering a message pattern whose groups become the node's ``notes[name]``.
+    """
+    def decorator(node_class:Type) -> Type:
+        NOTE_ENGINE.register(node_class, name, pattern)
+        return node_class
+    return decorator
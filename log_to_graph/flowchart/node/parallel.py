@@ -0,0 +1,56 @@
+import heapq
+import os
+from concurrent.futures import Executor
+from operator import attrgetter
+from typing import List, Optional, Sequence
+from .node import Node
+from .node_factory import node_factory_many
+
+# Below this many events the pool is not used even when one is given.
+# benchmarks/node_parallel.py measures a built-in node at about 6us to build
+# and 27us to ship to a worker and back, so 50k events build serially in about
+# half a second (1.5s on a pool of 2); only handlers costing well over 27us per
+# event gain from a pool, and below this size there is little left to save.
+PARALLEL_THRESHOLD = 50_000
+# Chunks handed out per worker, a few per worker evens out uneven chunks
+CHUNKS_PER_WORKER = 4
+
+_by_timestamp = attrgetter("timestamp")
+
+def _build_chunk(events: Sequence[dict]) -> List[Node]:
+    # Runs in the worker: build the chunk's nodes and sort them so the parent only merges
+    nodes = node_factory_many(events)
+    nodes.sort(key=_by_timestamp)
+    return nodes
+
+def node_factory_parallel(events: Sequence[dict],
+                          executor: Optional[Executor] = None,
+                          workers: Optional[int] = None,
+                          threshold: int = PARALLEL_THRESHOLD) -> List[Node]:
+    """
+    Build the nodes for a list of events, in timestamp order, optionally on an executor.
+
+    Without an ``executor``, or below ``threshold`` events, the nodes are built
+    serially in this process. Otherwise the events are split into chunks, each
+    chunk is built and sorted by the executor, and the sorted chunks are merged
+    back in timestamp order; events with equal timestamps keep their order.
+
+    The pool is opt-in because it rarely wins: every event is pickled to a
+    worker and every node pickled back, and for the built-in handlers that
+    transfer costs more than building the node (benchmarks/node_parallel.py).
+    It is meant for handlers that do expensive work per event, with a
+    long-lived executor shared across calls rather than one per request.
+
+    :param events: The events to build nodes for.
+    :param executor: Executor to run the chunks on, e.g. a ProcessPoolExecutor kept by the caller.
+    :param workers: Workers the executor runs, used to size the chunks; defaults to the number of CPUs.
+    :param threshold: Minimum number of events before the executor is used.
+    """
+    if executor is None or len(events) < threshold:
+        return _build_chunk(events)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = -(-len(events) // (workers * CHUNKS_PER_WORKER))
+    chunks = [events[i:i + chunk_size] for i in range(0, len(events), chunk_size)]
+    built = list(executor.map(_build_chunk, chunks))
+    return list(heapq.merge(*built, key=_by_timestamp))
@@ -0,0 +1,83 @@
+import warnings
+from importlib import metadata
+from typing import Callable, Optional, Type
+from .node import Node
+
+# Installed packages can register handlers without importing them first by
+# declaring entry points in this group. The entry point name is the exact Java
+# class name, or a package prefix ending in ".*":
+#
+#   [project.entry-points."log_to_graph.nodes"]
+#   "com.starlingbank.payments.PaymentHandler" = "my_plugin.nodes:PaymentNode"
+#   "com.starlingbank.fraud.*" = "my_plugin.nodes:FraudNode"
+ENTRY_POINT_GROUP = "log_to_graph.nodes"
+
+_exact: dict[str, Type[Node]] = {}
+_prefixes: dict[str, Type[Node]] = {}
+_resolved: dict[Optional[str], Type[Node]] = {}
+_entry_points_loaded = False
+
+def register_node(class_name:Optional[str] = None, *, prefix:Optional[str] = None) -> Callable[[Type[Node]], Type[Node]]:
+    """
+    Class decorator registering a Node subclass as the handler for log events.
+
+    :param class_name: Exact Java class name handled by the node, e.g. "com.starlingbank.workflow.WorkflowManager".
+    :param prefix: Package prefix handled by the node, e.g. "com.starlingbank.cardprocessor".
+        Exact names win over prefixes, and longer prefixes over shorter ones.
+    """
+    if (class_name is None) == (prefix is None):
+        raise ValueError("Give exactly one of class_name or prefix")
+
+    def decorator(node_class:Type[Node]) -> Type[Node]:
+        if class_name is not None:
+            _exact[class_name] = node_class
+        else:
+            _prefixes[prefix.rstrip(".")] = node_class
+        _resolved.clear()
+        return node_class
+    return decorator
+
+def _load_entry_points():
+    global _entry_points_loaded
+    _entry_points_loaded = True
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        group = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        group = entry_points.get(ENTRY_POINT_GROUP, [])
+    for entry_point in group:
+        # One broken plugin must not keep the others, or node_factory, from working
+        try:
+            node_class = entry_point.load()
+        except Exception as e:
+            warnings.warn(f"Skipping node handler entry point {entry_point.name!r}: {e!r}", RuntimeWarning)
+            continue
+        if entry_point.name.endswith(".*"):
+            register_node(prefix=entry_point.name[:-2])(node_class)
+        else:
+            register_node(entry_point.name)(node_class)
+
+def resolve_node_class(class_name:Optional[str]) -> Type[Node]:
+    """
+    Return the Node subclass handling events of the given Java class, Node if none does.
+    """
+    node_class = _resolved.get(class_name)
+    if node_class is not None:
+        return node_class
+    if not _entry_points_loaded:
+        _load_entry_points()
+
+    node_class = Node
+    if class_name is not None:
+        node_class = _exact.get(class_name)
+        if node_class is None:
+            # Walk up the package hierarchy so the longest registered prefix wins
+            package = class_name
+            node_class = Node
+            while "." in package:
+                package = package.rpartition(".")[0]
+                if package in _prefixes:
+                    node_class = _prefixes[package]
+                    break
+    _resolved[class_name] = node_class
+    return node_class
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+import humanize
+
+# Events whose ages fall in the same bucket share one formatted string.
+# humanize.precisedelta stops at seconds by default, so 1s loses nothing.
+DEFAULT_RESOLUTION = 1.0
+
+class RelativeTimeFormatter:
+    """
+    Formats event ages against a single reference time.
+
+    Every event of a chart is measured against the same clock, and the
+    formatted deltas are memoized per ``resolution``-sized bucket, so each
+    distinct age is only handed to humanize once.
+    """
+
+    def __init__(self, now:Optional[datetime] = None,
+                 resolution:float = DEFAULT_RESOLUTION,
+                 humanize_output:bool = True):
+        """
+        :param now: Reference time, defaults to the current time.
+        :param resolution: Bucket size in seconds for memoized deltas.
+        :param humanize_output: Use humanize's wording, or a cheap "<seconds>s ago" when False.
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        self.now = now or datetime.now()
+        self.resolution = resolution
+        self.humanize_output = humanize_output
+        self._now_ms = self.now.timestamp() * 1000.0
+        self._resolution_ms = resolution * 1000.0
+        self._memo: dict[int, str] = {}
+
+    def format(self, timestamp) -> str:
+        bucket = int((self._now_ms - timestamp) // self._resolution_ms)
+        text = self._memo.get(bucket)
+        if text is None:
+            delta = timedelta(milliseconds=bucket * self._resolution_ms)
+            if self.humanize_output:
+                text = f"{humanize.precisedelta(delta)} ago"
+            else:
+                text = f"{delta.total_seconds():.0f}s ago"
+            self._memo[bucket] = text
+        return text
+
+    def assign(self, nodes:Iterable):
+        """
+        Set ``relative_time`` on every node in one pass.
+        """
+        for node in nodes:
+            node.relative_time = self.format(node.timestamp)
+
+    def attach(self, nodes:Iterable):
+        """
+        Make the nodes format ``relative_time`` with this formatter the first time it is read.
+
+        Nothing is formatted up front, so charts whose output never shows the
+        relative times don't pay for them.
+        """
+        for node in nodes:
+            node.relative_time = self
@@ -0,0 +1,110 @@
+from collections import deque
+from typing import Optional, Sequence
+
+# Frames from these packages are kept, every other frame is elided
+DEFAULT_PACKAGES = ("com.starlingbank",)
+DEFAULT_MAX_FRAMES = 20
+DEFAULT_MAX_LINES = 60
+DEFAULT_MAX_LINE_LENGTH = 300
+DEFAULT_MAX_CAUSES = 5
+DEFAULT_MAX_SCANNED_FRAMES = 500
+
+_CAUSED_BY = "Caused by:"
+_ELIDED = "..."
+
+class StacktraceCondenser:
+    """
+    Shortens exception messages to the lines worth showing in a note.
+
+    Frames outside ``packages`` are replaced by a single ``...``, each
+    exception keeps at most ``max_frames`` frames and the output stops after
+    ``max_lines`` lines. Once an exception has used up its frames, or
+    ``max_scanned_frames`` were looked at, the rest of its frames are skipped
+    by jumping to the next ``Caused by:`` line, and once the line budget is
+    gone only ``Caused by:`` lines are collected, so the root cause of a long
+    chain is still shown and the work done stays bounded.
+    """
+
+    def __init__(self, packages: Optional[Sequence[str]] = DEFAULT_PACKAGES,
+                 max_frames: int = DEFAULT_MAX_FRAMES,
+                 max_lines: int = DEFAULT_MAX_LINES,
+                 max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+                 max_causes: int = DEFAULT_MAX_CAUSES,
+                 max_scanned_frames: int = DEFAULT_MAX_SCANNED_FRAMES):
+        """
+        :param packages: Package prefixes whose frames are kept, ``None`` keeps every frame.
+        :param max_frames: Frames kept per exception in the chain.
+        :param max_lines: Lines kept before only "Caused by" lines are collected.
+        :param max_line_length: Longer lines are cut and end with "...".
+        :param max_causes: "Caused by" lines kept past the line budget, the last ones win.
+        :param max_scanned_frames: Frames looked at per exception before skipping to its cause.
+        """
+        self.packages = tuple(packages) if packages is not None else None
+        self.max_frames = max_frames
+        self.max_lines = max_lines
+        self.max_line_length = max_line_length
+        self.max_causes = max_causes
+        self.max_scanned_frames = max_scanned_frames
+
+    def _truncate(self, line: str) -> str:
+        if len(line) > self.max_line_length:
+            return line[:self.max_line_length] + _ELIDED
+        return line
+
+    def _keep_frame(self, frame: str) -> bool:
+        return self.packages is None or any(package in frame for package in self.packages)
+
+    def _elide(self, lines: list):
+        if lines and lines[-1] != _ELIDED:
+            lines.append(_ELIDED)
+
+    def condense(self, message: str) -> str:
+        lines = []
+        kept = 0
+        scanned = 0
+        start = 0
+        length = len(message)
+        while start <= length:
+            end = message.find("\n", start)
+            if end == -1:
+                end = length
+            if len(lines) >= self.max_lines:
+                break
+            line = message[start:end]
+            stripped = line.strip()
+            if stripped.startswith("at ") or stripped.startswith("... "):
+                scanned += 1
+                if kept < self.max_frames and stripped.startswith("at ") and self._keep_frame(stripped):
+                    lines.append(self._truncate(line))
+                    kept += 1
+                else:
+                    self._elide(lines)
+                if kept >= self.max_frames or scanned >= self.max_scanned_frames:
+                    # Nothing more to show for this exception, go to its cause
+                    self._elide(lines)
+                    end = message.find("\n" + _CAUSED_BY, end)
+                    if end == -1:
+                        return "\n".join(lines)
+            else:
+                if stripped.startswith(_CAUSED_BY):
+                    kept = 0
+                    scanned = 0
+                lines.append(self._truncate(line))
+            start = end + 1
+        else:
+            return "\n".join(lines)
+
+        # Out of lines, keep only the tail of the cause chain
+        causes = deque(maxlen=self.max_causes)
+        position = message.find(_CAUSED_BY, start)
+        while position != -1:
+            line_end = message.find("\n", position)
+            if line_end == -1:
+                line_end = length
+            causes.append(self._truncate(message[position:line_end]))
+            position = message.find(_CAUSED_BY, line_end)
+        self._elide(lines)
+        lines.extend(causes)
+        return "\n".join(lines)
+
+DEFAULT_CONDENSER = StacktraceCondenser()
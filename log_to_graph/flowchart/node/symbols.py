@@ -0,0 +1,84 @@
+from typing import Tuple
+
+# Entries across all of the table's maps; far above the distinct names of any
+# set of traces, it only stops unbounded growth in long-running processes
+DEFAULT_MAX_SIZE = 100_000
+
+class SymbolTable:
+    """
+    Canonical instances of the strings that repeat across a trace.
+
+    A trace has only a handful of distinct services, groups and classes, but
+    every event carries its own copy of them. Nodes built through the table
+    share one string object per distinct value, and the strings derived from
+    them (split class names, lowercased groups, node ids) are only computed
+    the first time a value is seen.
+
+    Only low-cardinality values belong here. The table lives as long as the
+    process, so once it holds ``max_size`` entries it is emptied and starts
+    over; equal values seen after that are simply different objects.
+    """
+    __slots__ = ("max_size", "_strings", "_classes", "_groups", "_ids")
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param max_size: Entries kept before the table is emptied.
+        """
+        self.max_size = max_size
+        self._strings: dict[str, str] = {}
+        self._classes: dict[str, Tuple[str, str]] = {}
+        self._groups: dict[str, str] = {}
+        self._ids: dict[Tuple[str, str], str] = {}
+
+    def _reserve(self):
+        if len(self._strings) + len(self._classes) + len(self._groups) + len(self._ids) >= self.max_size:
+            self.clear()
+
+    def intern(self, value: str) -> str:
+        interned = self._strings.get(value)
+        if interned is None:
+            self._reserve()
+            interned = self._strings[value] = value
+        return interned
+
+    def class_name(self, qualified_name: str) -> Tuple[str, str]:
+        """
+        Split a Java class name into its (package, class) names.
+        """
+        names = self._classes.get(qualified_name)
+        if names is None:
+            self._reserve()
+            package_name, _, class_name = qualified_name.rpartition(".")
+            names = (self.intern(package_name), self.intern(class_name))
+            self._classes[qualified_name] = names
+        return names
+
+    def group(self, name: str) -> str:
+        """
+        The lowercased engineering group name.
+        """
+        group = self._groups.get(name)
+        if group is None:
+            self._reserve()
+            group = self._groups[name] = self.intern(name.lower())
+        return group
+
+    def node_id(self, service: str, class_name: str) -> str:
+        key = (service, class_name)
+        node_id = self._ids.get(key)
+        if node_id is None:
+            self._reserve()
+            node_id = self._ids[key] = self.intern(f"{service}_{class_name}")
+        return node_id
+
+    def __len__(self):
+        return len(self._strings) + len(self._classes) + len(self._groups) + len(self._ids)
+
+    def clear(self):
+        self._strings.clear()
+        self._classes.clear()
+        self._groups.clear()
+        self._ids.clear()
+
+# Shared by every Node, so equal names are the same object across charts
+SYMBOLS = SymbolTable()
@@ -1,13 +1,18 @@
-import re
 from graphviz import Digraph
 from ..theme.theme import Theme
 from .node import Node
+from .notes import note_pattern
+from .registry import register_node
 
+@register_node("com.starlingbank.workflow.WorkflowManager")
+@note_pattern("checkpoints", r"Workflow .* completed and went through the following checkpoints \[(.*?)\]")
 class WorkflowManagerNode(Node):
+    __slots__ = ()
+
     def addNote(self, theme: Theme, graph: Digraph):
-        match = re.search(r"Workflow .* completed and went through the following checkpoints \[(.*?)\]", self.message)
-        if match :
-            steps = "\n".join(match.group(1).split(", "))
+        checkpoints = self.notes.get("checkpoints")
+        if checkpoints :
+            steps = "\n".join(checkpoints[0].split(", "))
             graph.node(f'{self.getId()}_workflow_steps',
                         label=steps,
                         shape=theme.info_note.shape, 
@@ -0,0 +1,51 @@
+from .cache import EventCache, CacheStats, default_cache
+from .retry import RetryPolicy, QueryStats, QueryFailedError, DEFAULT_RETRY, NO_RETRY
+from .client import PooledHumioClient, get_client, close_clients, default_base_url, DEFAULT_BASE_URL
+from .query import (
+    iter_events,
+    iter_events_batch,
+    iter_events_adaptive,
+    query_logs,
+    query_logs_batch,
+    group_by_correlation_id,
+    DEFAULT_CHUNK_SIZE,
+    ADAPTIVE,
+    ADAPTIVE_WINDOWS,
+    parse_relative_time,
+    trace_looks_complete,
+    event_key,
+)
+from .live import LiveQuery, DEFAULT_LIVE_WINDOW
+from .aio import async_query_logs, DEFAULT_CONCURRENCY
+
+__all__ = [
+    'RetryPolicy',
+    'QueryStats',
+    'QueryFailedError',
+    'DEFAULT_RETRY',
+    'NO_RETRY',
+    'EventCache',
+    'CacheStats',
+    'default_cache',
+    'PooledHumioClient',
+    'get_client',
+    'close_clients',
+    'default_base_url',
+    'DEFAULT_BASE_URL',
+    'iter_events',
+    'iter_events_batch',
+    'iter_events_adaptive',
+    'query_logs',
+    'query_logs_batch',
+    'group_by_correlation_id',
+    'DEFAULT_CHUNK_SIZE',
+    'ADAPTIVE',
+    'ADAPTIVE_WINDOWS',
+    'parse_relative_time',
+    'trace_looks_complete',
+    'event_key',
+    'LiveQuery',
+    'DEFAULT_LIVE_WINDOW',
+    'async_query_logs',
+    'DEFAULT_CONCURRENCY',
+]
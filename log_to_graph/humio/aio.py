@@ -0,0 +1,133 @@
+import asyncio
+import contextlib
+import time
+from typing import Iterable, Optional, Sequence
+from humiolib.HumioExceptions import HumioException
+from ..flowchart.node.node import NODE_FIELDS, project_event
+from .client import PooledHumioClient, get_client
+from .query import _build_query, _fetch_segment, group_by_correlation_id
+from .retry import QueryFailedError, QueryStats
+
+# Maximum number of query jobs created and polled at the same time.
+DEFAULT_CONCURRENCY = 8
+
+def _delete_queryjob(client:PooledHumioClient, link:str):
+    try:
+        client.webcaller.call_rest("delete", link, headers=client._default_user_headers)
+    except HumioException:
+        pass
+
+def _queryjob_link(client:PooledHumioClient, query_id:str) -> str:
+    return f"dataspaces/{client.repository}/queryjobs/{query_id}"
+
+async def _run_queryjob(client:PooledHumioClient, query:str, start:str,
+                        fields:Optional[Sequence[str]] = None) -> list[dict]:
+    # The blocking HTTP calls run in worker threads on the pooled session, while
+    # the waits between polls happen on the event loop, so any number of jobs
+    # can be in flight without holding a thread while Humio is still working.
+    create = asyncio.ensure_future(
+        asyncio.to_thread(client.create_queryjob, query, is_live=False, start=start)
+    )
+    try:
+        queryjob = await asyncio.shield(create)
+    except asyncio.CancelledError:
+        # The worker thread can't be interrupted, so the job may still be created
+        # on Humio after we were cancelled; wait for it and delete it
+        with contextlib.suppress(Exception):
+            queryjob = await create
+            await asyncio.to_thread(_delete_queryjob, client, _queryjob_link(client, queryjob.query_id))
+        raise
+    link = _queryjob_link(client, queryjob.query_id)
+    events: list[dict] = []
+    try:
+        while True:
+            response = await asyncio.to_thread(_fetch_segment, client, link)
+            metadata = response["metaData"]
+            if not response["done"]:
+                await asyncio.sleep(metadata["pollAfter"] / 1000.0)
+                continue
+            events.extend(project_event(event, fields) for event in response["events"])
+            # Same rule as humiolib's poll(): only non-aggregate queries can have more segments
+            if metadata["isAggregate"] or metadata["extraData"].get("hasMoreEvents") != 'true':
+                return events
+            await asyncio.sleep(metadata["pollAfter"] / 1000.0)
+    except asyncio.CancelledError:
+        # Don't leave the job running on Humio once nobody is waiting for it
+        await asyncio.to_thread(_delete_queryjob, client, link)
+        raise
+
+async def async_query_logs(user_token:str, repo:str, start:str, correlation_ids:Iterable[str],
+                           concurrency:int = DEFAULT_CONCURRENCY,
+                           timeout:Optional[float] = None,
+                           base_url:Optional[str] = None,
+                           fields:Optional[Sequence[str]] = NODE_FIELDS,
+                           allow_partial:bool = False,
+                           errors:Optional[dict] = None) -> dict[str,list]:
+    """
+    Query logs for many correlation IDs concurrently, one Humio query job per ID.
+
+    At most ``concurrency`` query jobs are created and polled at the same time.
+    A job that fails or runs over ``timeout`` only loses its own correlation ID;
+    the other jobs keep running and their events are kept.
+    Cancelling the returned coroutine cancels every pending job and deletes it on Humio.
+
+    :param user_token: The Humio user token for authentication.
+    :param repo: The Humio repository to query.
+    :param start: The start time for the query, e.g., "12h" for the last 12 hours.
+    :param correlation_ids: The correlation IDs to filter logs, a single ID is also accepted.
+    :param concurrency: Maximum number of query jobs in flight.
+    :param timeout: Time budget in seconds for each query job, ``None`` for no limit.
+    :param base_url: URL of the Humio instance, defaults to ``HUMIO_BASE_URL`` or Humio cloud.
+    :param fields: Event fields to keep, defaults to the fields Node reads; ``None`` keeps every field.
+    :param allow_partial: Return the events of the jobs that finished instead of raising when any job fails.
+    :param errors: Optional dictionary filled with the exception of every correlation ID whose job
+        failed, ``asyncio.TimeoutError`` for jobs that exceeded ``timeout``.
+    :return: A dictionary of events keyed by correlation ID.
+    :raises QueryFailedError: If a job failed and ``allow_partial`` is not set, with the events of the
+        jobs that finished in ``partial``.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if isinstance(correlation_ids, str):
+        correlation_ids = [correlation_ids]
+    client = get_client(user_token, repo, base_url)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(correlation_id:str) -> list[dict]:
+        async with semaphore:
+            return await asyncio.wait_for(
+                _run_queryjob(client, _build_query([correlation_id], fields), start, fields), timeout
+            )
+
+    started = time.monotonic()
+    ids = list(dict.fromkeys(correlation_ids))
+    tasks = [asyncio.ensure_future(run(correlation_id)) for correlation_id in ids]
+    try:
+        # Each job's exception is returned in its place, so one failure doesn't cancel the rest
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    completed: list[list[dict]] = []
+    failures: dict[str,BaseException] = {}
+    for correlation_id, result in zip(ids, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            failures[correlation_id] = result
+        else:
+            completed.append(result)
+    event_map = group_by_correlation_id(event for events in completed for event in events)
+
+    if errors is not None:
+        errors.update(failures)
+    if failures and not allow_partial:
+        stats = QueryStats(events=sum(len(events) for events in event_map.values()),
+                           elapsed=time.monotonic() - started)
+        failed = ", ".join(failures)
+        raise QueryFailedError(f"{len(failures)} of {len(ids)} query jobs failed: {failed}",
+                               stats, partial=event_map) from next(iter(failures.values()))
+    return event_map
@@ -0,0 +1,181 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "log_to_graph", "events")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MiB of compressed events
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+# A trace whose newest event is younger than this may still be growing
+DEFAULT_SETTLE = 15 * 60  # seconds
+
+_SUFFIX = ".json.gz"
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+class EventCache:
+    """
+    Persistent on-disk cache of query results.
+
+    Entries are keyed by (base_url, repo, correlation_id, start, end) plus the
+    projected field set, so instances never share results, and stored as gzip compressed JSON, one file per entry. Entries
+    older than ``ttl`` seconds are treated as misses, and once the directory
+    grows beyond ``max_bytes`` the least recently used entries are evicted.
+
+    Query windows are relative ("3h" ends now), so a result is only stored once
+    the trace has settled: empty results, and results whose newest event is
+    less than ``settle`` seconds old, are not cached, since the trace may not
+    be ingested yet or may still be running.
+    """
+
+    def __init__(self, directory:Optional[str] = None,
+                 max_bytes:int = DEFAULT_MAX_BYTES,
+                 ttl:Optional[float] = DEFAULT_TTL,
+                 settle:float = DEFAULT_SETTLE):
+        """
+        :param directory: Where entries are stored, defaults to ``LOG_TO_GRAPH_CACHE_DIR``
+            or ``~/.cache/log_to_graph/events``.
+        :param max_bytes: Size cap for all entries on disk.
+        :param ttl: Entry lifetime in seconds, ``None`` to keep entries until evicted.
+        :param settle: Minimum age in seconds of a result's newest event before it is cached.
+        """
+        self.directory = directory or os.getenv("LOG_TO_GRAPH_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.settle = settle
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(repo:str, correlation_id:str, start:str, end:Optional[str] = None,
+            fields:Optional[Sequence[str]] = None, base_url:Optional[str] = None) -> str:
+        raw = json.dumps([base_url, repo, correlation_id, start, end, list(fields) if fields else None])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key:str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, repo:str, correlation_id:str, start:str, end:Optional[str] = None,
+            fields:Optional[Sequence[str]] = None, base_url:Optional[str] = None) -> Optional[list[dict]]:
+        """
+        Return the cached events for the query, or ``None`` on a miss.
+
+        :param base_url: URL of the Humio instance the events came from.
+        """
+        path = self._path(self.key(repo, correlation_id, start, end, fields, base_url))
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats.misses += 1
+            return None
+
+        if self.ttl is not None and time.time() - entry["created"] > self.ttl:
+            self._remove(path)
+            with self._lock:
+                self.stats.expirations += 1
+                self.stats.misses += 1
+            return None
+
+        # The file's mtime doubles as its last-access time for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.stats.hits += 1
+        return entry["events"]
+
+    def is_settled(self, events:list[dict], now:Optional[float] = None) -> bool:
+        """
+        Whether a query result is final enough to cache, see the class docstring.
+        """
+        if not events:
+            return False
+        try:
+            newest = max(event["@timestamp"] for event in events) / 1000.0
+        except KeyError:
+            # Without timestamps the age of the trace is unknown
+            return False
+        if now is None:
+            now = time.time()
+        return now - newest >= self.settle
+
+    def put(self, repo:str, correlation_id:str, start:str, events:list[dict], end:Optional[str] = None,
+            fields:Optional[Sequence[str]] = None, base_url:Optional[str] = None) -> bool:
+        """
+        Store the events of a completed query, if the trace has settled.
+
+        :param base_url: URL of the Humio instance the events came from.
+        :return: Whether the events were stored.
+        """
+        if not self.is_settled(events):
+            return False
+        path = self._path(self.key(repo, correlation_id, start, end, fields, base_url))
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "events": events}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self._evict()
+        return True
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> list[os.DirEntry]:
+        with os.scandir(self.directory) as it:
+            return [entry for entry in it if entry.name.endswith(_SUFFIX)]
+
+    @staticmethod
+    def _remove(path:str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            with self._lock:
+                self.stats.evictions += 1
+
+_default_cache: Optional[EventCache] = None
+
+def default_cache() -> EventCache:
+    """
+    Return the process-wide cache shared by the web app and the notebooks.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = EventCache()
+    return _default_cache
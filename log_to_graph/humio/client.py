@@ -0,0 +1,102 @@
+import os
+import threading
+from typing import Optional
+import requests
+from humiolib.HumioClient import HumioClient
+from humiolib.HumioExceptions import HumioConnectionException, HumioHTTPException, HumioTimeoutException
+from humiolib.WebCaller import WebCaller
+
+DEFAULT_BASE_URL = "https://cloud.humio.com"
+# Seconds a single HTTP request may take before it fails with HumioTimeoutException
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+def default_base_url() -> str:
+    """
+    Base URL used when none is given explicitly.
+
+    Reads ``HUMIO_BASE_URL`` from the environment so the whole query path can be
+    pointed at a local stand-in server, falling back to Humio cloud.
+    """
+    return os.getenv("HUMIO_BASE_URL", DEFAULT_BASE_URL)
+
+class SessionWebCaller(WebCaller):
+    """
+    WebCaller that sends every request through a shared ``requests.Session``,
+    so TCP connections and TLS sessions are kept alive between calls.
+
+    Requests without an explicit ``timeout`` get the caller's default, so a
+    hung connection can't block a query forever.
+    """
+
+    def __init__(self, base_url:str, session:requests.Session,
+                 timeout:Optional[float] = DEFAULT_REQUEST_TIMEOUT):
+        super().__init__(base_url)
+        self.session = session
+        self.timeout = timeout
+
+    def _make_request(self, verb, link, headers=None, data=None, files=None, stream=False, **kwargs):
+        # Same error mapping as WebCaller._make_request, but on the pooled session.
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(
+                verb, link, data=data, headers=headers, stream=stream, files=files, **kwargs
+            )
+            response.raise_for_status()
+        except requests.exceptions.ConnectionError as e:
+            raise HumioConnectionException(e)
+        except requests.exceptions.HTTPError as e:
+            raise HumioHTTPException(e.response.text, e.response.status_code)
+        except requests.exceptions.Timeout as e:
+            raise HumioTimeoutException(e)
+
+        return response
+
+class PooledHumioClient(HumioClient):
+    """
+    HumioClient whose client and query job requests share one keep-alive session.
+    """
+
+    def __init__(self, repository:str, user_token:str, base_url:str = DEFAULT_BASE_URL,
+                 timeout:Optional[float] = DEFAULT_REQUEST_TIMEOUT):
+        super().__init__(repository=repository, user_token=user_token, base_url=base_url)
+        self.session = requests.Session()
+        self.webcaller = SessionWebCaller(base_url, self.session, timeout)
+
+    def create_queryjob(self, *args, **kwargs):
+        queryjob = super().create_queryjob(*args, **kwargs)
+        # humiolib gives every query job its own WebCaller; point it at ours
+        # so polling reuses the same connections.
+        queryjob.webcaller = self.webcaller
+        return queryjob
+
+    def close(self):
+        self.session.close()
+
+_clients: dict[tuple[str,str,str], PooledHumioClient] = {}
+_clients_lock = threading.Lock()
+
+def get_client(user_token:str, repo:str, base_url:Optional[str] = None) -> PooledHumioClient:
+    """
+    Return the shared client for (base_url, repo, user_token), creating it on first use.
+
+    :param user_token: The Humio user token for authentication.
+    :param repo: The Humio repository to query.
+    :param base_url: URL of the Humio instance, defaults to :func:`default_base_url`.
+    :return: A pooled client reused across calls.
+    """
+    key = (base_url or default_base_url(), repo, user_token)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = PooledHumioClient(repository=repo, user_token=user_token, base_url=key[0])
+            _clients[key] = client
+        return client
+
+def close_clients():
+    """
+    Close every pooled client and empty the pool.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
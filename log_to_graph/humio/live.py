@@ -0,0 +1,107 @@
+import time
+from typing import Callable, Optional, Sequence
+from humiolib.HumioExceptions import HumioException, HumioQueryJobExpiredException
+from ..flowchart.node.node import NODE_FIELDS, project_event
+from .client import get_client
+from .query import _build_query, _fetch_segment, _request_kwargs, event_key
+from .retry import DEFAULT_RETRY, QueryFailedError, QueryStats, RetryPolicy, is_transient
+
+# Default window a live query job keeps results for.
+DEFAULT_LIVE_WINDOW = "1h"
+
+class LiveQuery:
+    """
+    A live Humio query job for a correlation ID that reports only new events.
+
+    Every poll of a live query job returns the events currently inside its
+    window, so already delivered events are filtered out by their ``@id``.
+    Transient errors are retried following ``retry`` and an expired job is
+    recreated, so a long session survives a short outage on Humio's side. The
+    job is deleted on Humio when the query is closed.
+    """
+
+    def __init__(self, user_token:str, repo:str, correlation_id:str,
+                 start:str = DEFAULT_LIVE_WINDOW,
+                 base_url:Optional[str] = None,
+                 fields:Optional[Sequence[str]] = NODE_FIELDS,
+                 retry:RetryPolicy = DEFAULT_RETRY,
+                 stats:Optional[QueryStats] = None):
+        """
+        :param user_token: The Humio user token for authentication.
+        :param repo: The Humio repository to query.
+        :param correlation_id: The correlation ID to follow.
+        :param start: Window of the live query, e.g., "1h".
+        :param base_url: URL of the Humio instance, defaults to ``HUMIO_BASE_URL`` or Humio cloud.
+        :param fields: Event fields to keep, defaults to the fields Node reads; ``None`` keeps every field.
+        :param retry: Retry and backoff settings for transient Humio errors, applied to each
+            request; its deadline is not used, a live query runs until it is closed.
+        :param stats: Optional QueryStats updated with the polls, retries and events of the query.
+        """
+        self.correlation_id = correlation_id
+        self.fields = fields
+        self.retry = retry
+        self.stats = stats if stats is not None else QueryStats()
+        self._client = get_client(user_token, repo, base_url)
+        # The projected query keeps @id, which recognises events we already delivered
+        self._query = _build_query([correlation_id], fields)
+        self._start = start
+        self._queryjob = None
+        self._seen: set = set()
+        self._call(lambda: None)
+
+    def _call(self, request:Callable[[], Optional[dict]]) -> Optional[dict]:
+        # Runs the request, creating the live job first when there is none, and
+        # retries transient failures with backoff
+        attempt = 0
+        while True:
+            try:
+                if self._queryjob is None:
+                    self._queryjob = self._client.create_queryjob(
+                        self._query, is_live=True, start=self._start, **_request_kwargs(self.retry, None)
+                    )
+                return request()
+            except Exception as e:
+                if not is_transient(e) or attempt >= self.retry.max_retries:
+                    raise QueryFailedError(f"Live query failed after {attempt} retries: {e}", self.stats) from e
+                if isinstance(e, HumioQueryJobExpiredException):
+                    # Events the new job returns again are still filtered out by @id
+                    self._queryjob = None
+                    self.stats.restarts += 1
+                time.sleep(self.retry.backoff(attempt))
+                attempt += 1
+                self.stats.retries += 1
+
+    def _fetch(self) -> dict:
+        self.stats.polls += 1
+        link = f"dataspaces/{self._client.repository}/queryjobs/{self._queryjob.query_id}"
+        return _fetch_segment(self._client, link, **_request_kwargs(self.retry, None))
+
+    def poll(self) -> list[dict]:
+        """
+        Return the events that arrived since the previous poll.
+        """
+        new_events = []
+        for event in self._call(self._fetch)["events"]:
+            key = event_key(event)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            self.stats.events += 1
+            new_events.append(project_event(event, self.fields))
+        return new_events
+
+    def close(self):
+        if self._queryjob is None:
+            return
+        queryjob, self._queryjob = self._queryjob, None
+        try:
+            endpoint = f"dataspaces/{queryjob.repository}/queryjobs/{queryjob.query_id}"
+            queryjob.webcaller.call_rest("delete", endpoint, headers=queryjob._default_user_headers)
+        except HumioException:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
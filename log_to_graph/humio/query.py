@@ -0,0 +1,369 @@
+import re
+import time
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+from humiolib.HumioExceptions import HumioHTTPException, HumioQueryJobExpiredException
+from ..flowchart.node.node import NODE_FIELDS, project_event
+from .cache import EventCache
+from .client import PooledHumioClient, default_base_url, get_client
+from .retry import DEFAULT_RETRY, QueryFailedError, QueryStats, RetryPolicy, is_transient
+
+# Number of correlation IDs sent in a single query job by the batch API.
+# Keeps the generated query string well under Humio's query-size limits.
+DEFAULT_CHUNK_SIZE = 50
+
+# Passing this as ``start`` searches ADAPTIVE_WINDOWS from the narrowest up.
+ADAPTIVE = "auto"
+ADAPTIVE_WINDOWS = ("3h", "12h", "1d", "7d", "30d")
+
+_TIME_UNITS_MS = {
+    "ms": 1,
+    "s": 1000,
+    "m": 60 * 1000,
+    "h": 60 * 60 * 1000,
+    "d": 24 * 60 * 60 * 1000,
+    "w": 7 * 24 * 60 * 60 * 1000,
+}
+
+def parse_relative_time(start:str) -> int:
+    """
+    Convert a Humio relative time such as "12h" or "7d" to milliseconds.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*(ms|s|m|h|d|w)\s*", start)
+    if not match:
+        raise ValueError(f"Unsupported relative time: {start!r}")
+    return int(match.group(1)) * _TIME_UNITS_MS[match.group(2)]
+
+def trace_looks_complete(events:list[dict], window:str, now_ms:Optional[float] = None,
+                         margin:float = 0.1) -> bool:
+    """
+    Guess whether a window captured the whole trace.
+
+    The newest events are always inside a window ending now, so only the head
+    of the trace can be cut off. If the oldest event sits within ``margin``
+    (a fraction of the window) of the window's start, earlier events may lie
+    outside it and a wider window is worth trying.
+    """
+    if not events:
+        return False
+    if now_ms is None:
+        now_ms = time.time() * 1000
+    window_ms = parse_relative_time(window)
+    oldest = min(event["@timestamp"] for event in events)
+    return oldest - (now_ms - window_ms) > window_ms * margin
+
+def _build_query(correlation_ids:list[str], fields:Optional[Sequence[str]] = None) -> str:
+    # A single ID keeps the original query shape; several IDs are OR-ed together
+    # inside the same join so Humio resolves all of them in one query job.
+    if len(correlation_ids) == 1:
+        search = correlation_ids[0]
+    else:
+        search = f"({' or '.join(correlation_ids)})"
+    query = f" join({{{search} class=* service=*}}, field=correlation_id)"
+    # Let Humio drop the fields we never read instead of shipping them to us.
+    # @id is always kept so re-run query jobs can skip events already delivered.
+    if fields:
+        selected = list(fields) if "@id" in fields else [*fields, "@id"]
+        query += f" | select([{', '.join(selected)}])"
+    return query
+
+def _chunks(items:list, size:int) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def event_key(event:dict):
+    """
+    Identity of an event, used to drop duplicates when a query job is re-run.
+    """
+    # Humio's @id is unique per event; fall back to the fields that identify a log line
+    if "@id" in event:
+        return event["@id"]
+    return (event.get("@timestamp"), event.get("class"), event.get("service"), event.get("message"))
+
+def _request_kwargs(retry:RetryPolicy, deadline:Optional[float]) -> dict:
+    # Each request gets the policy's timeout, shortened to what is left of the deadline
+    timeout = retry.request_timeout
+    if deadline is not None:
+        remaining = max(0.001, deadline - time.monotonic())
+        timeout = remaining if timeout is None else min(timeout, remaining)
+    return {} if timeout is None else {"timeout": timeout}
+
+def _fetch_segment(client:PooledHumioClient, link:str, **kwargs) -> dict:
+    try:
+        return client.webcaller.call_rest("get", link, headers=client._default_user_headers, **kwargs).json()
+    except HumioHTTPException as e:
+        # Same translation as humiolib's query jobs: a 404 means the job expired
+        if e.status_code == 404:
+            raise HumioQueryJobExpiredException(e.message)
+        raise
+
+def _iter_query(client:PooledHumioClient, query:str, start:str,
+                fields:Optional[Sequence[str]] = None,
+                retry:RetryPolicy = DEFAULT_RETRY,
+                stats:Optional[QueryStats] = None) -> Iterator[dict]:
+    # Polls the query job segment by segment, the same way humiolib's
+    # poll_until_done() does, but retries transient failures with backoff and
+    # recreates the job if it expires, skipping events that were already
+    # delivered so the caller keeps everything gathered so far.
+    stats = stats if stats is not None else QueryStats()
+    started = time.monotonic()
+    deadline = None if retry.deadline is None else started + retry.deadline
+    seen: set = set()
+    link = None
+    attempt = 0
+
+    while True:
+        if deadline is not None and time.monotonic() > deadline:
+            stats.elapsed = time.monotonic() - started
+            raise QueryFailedError(f"Query exceeded its {retry.deadline}s deadline", stats)
+        try:
+            if link is None:
+                queryjob = client.create_queryjob(query, is_live=False, start=start,
+                                                  **_request_kwargs(retry, deadline))
+                link = f"dataspaces/{client.repository}/queryjobs/{queryjob.query_id}"
+            stats.polls += 1
+            response = _fetch_segment(client, link, **_request_kwargs(retry, deadline))
+        except Exception as e:
+            if not is_transient(e) or attempt >= retry.max_retries:
+                stats.elapsed = time.monotonic() - started
+                raise QueryFailedError(f"Query failed after {stats.retries} retries: {e}", stats) from e
+            if isinstance(e, HumioQueryJobExpiredException):
+                link = None
+                stats.restarts += 1
+            delay = retry.backoff(attempt)
+            if deadline is not None:
+                delay = max(0.0, min(delay, deadline - time.monotonic()))
+            time.sleep(delay)
+            attempt += 1
+            stats.retries += 1
+            continue
+        attempt = 0
+
+        metadata = response["metaData"]
+        if response["done"]:
+            # Slim events on arrival too, in case the server returns extra fields
+            for event in response["events"]:
+                key = event_key(event)
+                if key in seen:
+                    continue
+                seen.add(key)
+                stats.events += 1
+                yield project_event(event, fields)
+            if metadata["isAggregate"] or metadata["extraData"].get("hasMoreEvents") != 'true':
+                stats.elapsed = time.monotonic() - started
+                return
+        delay = metadata["pollAfter"] / 1000.0
+        if deadline is not None:
+            delay = max(0.0, min(delay, deadline - time.monotonic()))
+        time.sleep(delay)
+
+def iter_events(user_token:str, repo:str, start:str, correlation_id:str,
+                base_url:Optional[str] = None,
+                cache:Optional[EventCache] = None,
+                fields:Optional[Sequence[str]] = NODE_FIELDS,
+                retry:RetryPolicy = DEFAULT_RETRY,
+                stats:Optional[QueryStats] = None) -> Iterator[dict]:
+    """
+    Stream log events from Humio repository based on correlation_id.
+
+    Events are yielded as soon as the poll segment containing them arrives,
+    so callers can start processing the first batch while later segments
+    are still being fetched. When a cache is given, cached results are
+    replayed without querying Humio, and a fully consumed query is stored
+    once its trace has settled (see :class:`EventCache`).
+
+    With ``start=ADAPTIVE`` the search widens through ``ADAPTIVE_WINDOWS``,
+    see :func:`iter_events_adaptive`.
+
+    :param user_token: The Humio user token for authentication.
+    :param repo: The Humio repository to query.
+    :param start: The start time for the query, e.g., "12h" for the last 12 hours, or ``ADAPTIVE``.
+    :param correlation_id: The correlation ID to filter logs.
+    :param base_url: URL of the Humio instance, defaults to ``HUMIO_BASE_URL`` or Humio cloud.
+    :param cache: Optional event cache to read from and populate.
+    :param fields: Event fields to keep, defaults to the fields Node reads; ``None`` keeps every field.
+    :param retry: Retry, backoff and deadline settings for transient Humio errors.
+    :param stats: Optional QueryStats updated with the polls, retries and events of the query.
+    :return: An iterator over the events matching the correlation ID.
+    """
+    if start == ADAPTIVE:
+        yield from iter_events_adaptive(user_token, repo, correlation_id,
+                                        base_url=base_url, cache=cache, fields=fields,
+                                        retry=retry, stats=stats)
+        return
+
+    # Resolved here so cached results are kept apart per Humio instance
+    base_url = base_url or default_base_url()
+    if cache is not None:
+        cached = cache.get(repo, correlation_id, start, fields=fields, base_url=base_url)
+        if cached is not None:
+            yield from cached
+            return
+
+    client = get_client(user_token, repo, base_url)
+    events = _iter_query(client, _build_query([correlation_id], fields), start, fields, retry, stats)
+    if cache is None:
+        yield from events
+        return
+
+    collected = []
+    for event in events:
+        collected.append(event)
+        yield event
+    cache.put(repo, correlation_id, start, collected, fields=fields, base_url=base_url)
+
+def iter_events_adaptive(user_token:str, repo:str, correlation_id:str,
+                         windows:Sequence[str] = ADAPTIVE_WINDOWS,
+                         is_complete:Callable[[list[dict], str], bool] = trace_looks_complete,
+                         base_url:Optional[str] = None,
+                         cache:Optional[EventCache] = None,
+                         fields:Optional[Sequence[str]] = NODE_FIELDS,
+                         retry:RetryPolicy = DEFAULT_RETRY,
+                         stats:Optional[QueryStats] = None) -> Iterator[dict]:
+    """
+    Search for a correlation ID in progressively wider time windows.
+
+    Each window is queried in turn, narrowest first, and the search stops at
+    the first window whose events ``is_complete`` accepts. If none does, the
+    events of the widest window that found any are returned. Events are
+    yielded once a window has been accepted, since a window can only be
+    judged after all of its events have arrived.
+
+    :param user_token: The Humio user token for authentication.
+    :param repo: The Humio repository to query.
+    :param correlation_id: The correlation ID to filter logs.
+    :param windows: Relative start times to try, from narrowest to widest.
+    :param is_complete: Decides from (events, window) whether to stop widening.
+    :param base_url: URL of the Humio instance, defaults to ``HUMIO_BASE_URL`` or Humio cloud.
+    :param cache: Optional event cache to read from and populate.
+    :param fields: Event fields to keep, defaults to the fields Node reads; ``None`` keeps every field.
+    :param retry: Retry, backoff and deadline settings for transient Humio errors.
+    :param stats: Optional QueryStats updated with the polls, retries and events of the query.
+    :return: An iterator over the events matching the correlation ID.
+    """
+    # Completeness needs the timestamps even if the caller projected them away
+    query_fields = fields
+    if fields and "@timestamp" not in fields:
+        query_fields = (*fields, "@timestamp")
+
+    found: list[dict] = []
+    for window in windows:
+        events = list(iter_events(user_token, repo, window, correlation_id,
+                                  base_url=base_url, cache=cache, fields=query_fields,
+                                  retry=retry, stats=stats))
+        if events:
+            found = events
+            if is_complete(events, window):
+                break
+
+    for event in found:
+        yield project_event(event, fields)
+
+def iter_events_batch(user_token:str, repo:str, start:str, correlation_ids:Iterable[str],
+                      chunk_size:int = DEFAULT_CHUNK_SIZE,
+                      base_url:Optional[str] = None,
+                      fields:Optional[Sequence[str]] = NODE_FIELDS,
+                      retry:RetryPolicy = DEFAULT_RETRY,
+                      stats:Optional[QueryStats] = None) -> Iterator[dict]:
+    """
+    Stream log events for many correlation IDs using as few query jobs as possible.
+
+    The IDs are de-duplicated and split into chunks of ``chunk_size``; each chunk
+    is sent to Humio as a single query job.
+
+    :param user_token: The Humio user token for authentication.
+    :param repo: The Humio repository to query.
+    :param start: The start time for the query, e.g., "12h" for the last 12 hours.
+    :param correlation_ids: The correlation IDs to filter logs.
+    :param chunk_size: Maximum number of correlation IDs per query job.
+    :param base_url: URL of the Humio instance, defaults to ``HUMIO_BASE_URL`` or Humio cloud.
+    :param fields: Event fields to keep, defaults to the fields Node reads; ``None`` keeps every field.
+    :param retry: Retry, backoff and deadline settings for transient Humio errors.
+    :param stats: Optional QueryStats updated with the polls, retries and events of the query.
+    :return: An iterator over the events matching any of the correlation IDs.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    ids = list(dict.fromkeys(correlation_ids))
+    if not ids:
+        return
+    client = get_client(user_token, repo, base_url)
+    for chunk in _chunks(ids, chunk_size):
+        yield from _iter_query(client, _build_query(chunk, fields), start, fields, retry, stats)
+
+def group_by_correlation_id(events) -> dict[str,list]:
+    """
+    Group events by their correlation_id, preserving arrival order.
+
+    :param events: An iterable of Humio events.
+    :return: A dictionary mapping each correlation ID to its events.
+    """
+    event_map: dict[str,list] = {}
+    for event in events:
+        event_map.setdefault(event["correlation_id"], []).append(event)
+    return event_map
+
+def _collect(events:Iterator[dict], allow_partial:bool) -> dict[str,list]:
+    event_map: dict[str,list] = {}
+    try:
+        for event in events:
+            event_map.setdefault(event["correlation_id"], []).append(event)
+    except QueryFailedError as e:
+        if allow_partial:
+            return event_map
+        e.partial = event_map
+        raise
+    return event_map
+
+def query_logs(user_token:str, repo:str, start:str, correlation_id:str,
+               base_url:Optional[str] = None,
+               cache:Optional[EventCache] = None,
+               fields:Optional[Sequence[str]] = NODE_FIELDS,
+               retry:RetryPolicy = DEFAULT_RETRY,
+               stats:Optional[QueryStats] = None,
+               allow_partial:bool = False) -> dict[str,list]:
+    """
+    Query logs from Humio repository based on correlation_id.
+
+    :param user_token: The Humio user token for authentication.
+    :param repo: The Humio repository to query.
+    :param start: The start time for the query, e.g., "12h" for the last 12 hours,
+        or ``ADAPTIVE`` to widen the window until the trace is found.
+    :param correlation_id: The correlation ID to filter logs.
+    :param base_url: URL of the Humio instance, defaults to ``HUMIO_BASE_URL`` or Humio cloud.
+    :param cache: Optional event cache to read from and populate.
+    :param fields: Event fields to keep, defaults to the fields Node reads; ``None`` keeps every field.
+    :param retry: Retry, backoff and deadline settings for transient Humio errors.
+    :param stats: Optional QueryStats updated with the polls, retries and events of the query.
+    :param allow_partial: Return the events gathered so far instead of raising when the query fails.
+    :return: A dictionary of events matching the correlation ID.
+    :raises QueryFailedError: If the query gives up, with the events gathered so far in ``partial``.
+    """
+    events = iter_events(user_token, repo, start, correlation_id, base_url, cache, fields, retry, stats)
+    return _collect(events, allow_partial)
+
+def query_logs_batch(user_token:str, repo:str, start:str, correlation_ids:Iterable[str],
+                     chunk_size:int = DEFAULT_CHUNK_SIZE,
+                     base_url:Optional[str] = None,
+                     fields:Optional[Sequence[str]] = NODE_FIELDS,
+                     retry:RetryPolicy = DEFAULT_RETRY,
+                     stats:Optional[QueryStats] = None,
+                     allow_partial:bool = False) -> dict[str,list]:
+    """
+    Query logs from Humio repository for many correlation IDs at once.
+
+    :param user_token: The Humio user token for authentication.
+    :param repo: The Humio repository to query.
+    :param start: The start time for the query, e.g., "12h" for the last 12 hours.
+    :param correlation_ids: The correlation IDs to filter logs.
+    :param chunk_size: Maximum number of correlation IDs per query job.
+    :param base_url: URL of the Humio instance, defaults to ``HUMIO_BASE_URL`` or Humio cloud.
+    :param fields: Event fields to keep, defaults to the fields Node reads; ``None`` keeps every field.
+    :param retry: Retry, backoff and deadline settings for transient Humio errors.
+    :param stats: Optional QueryStats updated with the polls, retries and events of the query.
+    :param allow_partial: Return the events gathered so far instead of raising when the query fails.
+    :return: A dictionary of events keyed by correlation ID.
+    :raises QueryFailedError: If the query gives up, with the events gathered so far in ``partial``.
+    """
+    events = iter_events_batch(user_token, repo, start, correlation_ids, chunk_size, base_url,
+                               fields, retry, stats)
+    return _collect(events, allow_partial)
@@ -0,0 +1,63 @@
+import random
+from dataclasses import dataclass
+from typing import Optional
+from humiolib.HumioExceptions import (
+    HumioConnectionDroppedException,
+    HumioConnectionException,
+    HumioException,
+    HumioHTTPException,
+    HumioQueryJobExpiredException,
+    HumioTimeoutException,
+)
+from .client import DEFAULT_REQUEST_TIMEOUT
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int = 4  # Consecutive failed requests tolerated before giving up
+    base_delay: float = 0.5  # Seconds to wait before the first retry
+    max_delay: float = 10.0  # Upper bound for a single backoff
+    jitter: float = 0.5  # Fraction of each backoff that is randomised
+    deadline: Optional[float] = None  # Overall time budget for the query in seconds
+    request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT  # Seconds per HTTP request, None for the client's default
+
+    def backoff(self, attempt:int) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (starting at 0), exponential with jitter.
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+
+DEFAULT_RETRY = RetryPolicy()
+NO_RETRY = RetryPolicy(max_retries=0)
+
+@dataclass
+class QueryStats:
+    polls: int = 0  # Poll requests sent to Humio
+    retries: int = 0  # Requests repeated after a transient error
+    restarts: int = 0  # Query jobs recreated after they expired on Humio
+    events: int = 0  # Events delivered to the caller
+    elapsed: float = 0.0  # Wall-clock seconds spent on the query
+
+class QueryFailedError(HumioException):
+    """
+    Raised when a query gives up, keeping whatever it gathered before the failure.
+
+    ``partial`` holds the events already collected, grouped by correlation ID
+    when raised from ``query_logs``; ``stats`` tells how far the query got.
+    """
+
+    def __init__(self, message:str, stats:QueryStats, partial=None):
+        super().__init__(message)
+        self.stats = stats
+        self.partial = partial
+
+def is_transient(error:Exception) -> bool:
+    """
+    Whether retrying the request that raised ``error`` may succeed.
+    """
+    if isinstance(error, (HumioConnectionException, HumioTimeoutException,
+                          HumioConnectionDroppedException, HumioQueryJobExpiredException)):
+        return True
+    if isinstance(error, HumioHTTPException):
+        return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+    return False
@@ -0,0 +1,13 @@
+from .cache import RenderCache, RenderCacheStats, default_render_cache
+from .pool import RenderPool, RenderTimeoutError, default_render_pool, INTERACTIVE, BATCH
+
+__all__ = [
+    'RenderCache',
+    'RenderCacheStats',
+    'default_render_cache',
+    'RenderPool',
+    'RenderTimeoutError',
+    'default_render_pool',
+    'INTERACTIVE',
+    'BATCH',
+]
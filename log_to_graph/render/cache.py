@@ -0,0 +1,207 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_RENDER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "log_to_graph", "renders")
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024  # 64 MiB of rendered output
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024  # 512 MiB of compressed output
+
+_SUFFIX = ".gz"
+
+@dataclass
+class RenderCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+class RenderCache:
+    """
+    Cache of rendered charts, addressed by the digest of what Graphviz is given.
+
+    The key covers the DOT source, the layout engine and the output format,
+    so identical charts hit the cache whichever process or chart object built
+    them. Rendered output is kept in an in-memory LRU bounded by entry count
+    and bytes, and optionally in a directory of gzip compressed files bounded
+    by ``max_disk_bytes`` where the least recently used files are evicted.
+    """
+
+    def __init__(self, directory:Optional[str] = None,
+                 max_entries:int = DEFAULT_MAX_ENTRIES,
+                 max_memory_bytes:int = DEFAULT_MAX_MEMORY_BYTES,
+                 max_disk_bytes:int = DEFAULT_MAX_DISK_BYTES):
+        """
+        :param directory: Where the on-disk tier stores entries, ``None`` keeps entries in memory only.
+        :param max_entries: Number of renders kept in memory.
+        :param max_memory_bytes: Size cap for the renders kept in memory.
+        :param max_disk_bytes: Size cap for all entries on disk.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = RenderCacheStats()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(source:str, format:str = "svg", engine:str = "dot", unflatten:Optional[dict] = None) -> str:
+        """
+        Cache key of a render, ``unflatten`` being the options of an unflatten pass run on ``source`` first.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{engine}\0{format}\0".encode("utf-8"))
+        if unflatten is not None:
+            digest.update(f"unflatten {json.dumps(unflatten, sort_keys=True)}\0".encode("utf-8"))
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key:str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)  # type: ignore
+
+    def get(self, key:str) -> Optional[bytes]:
+        """
+        Return the rendered output for the key, or ``None`` on a miss.
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return data
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with gzip.open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is not None:
+                # The file's mtime doubles as its last-access time for LRU eviction
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                self._remember(key, data)
+                with self._lock:
+                    self.stats.disk_hits += 1
+                return data
+
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def put(self, key:str, data:bytes):
+        self._remember(key, data)
+        if self.directory is not None:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+
+    def render(self, graph, format:Optional[str] = None) -> bytes:
+        """
+        Render a ``graphviz`` graph like ``graph.pipe(format=format)``, reusing a cached result.
+        """
+        format = format or graph.format
+        key = self.key(graph.source, format, graph.engine)
+        data = self.get(key)
+        if data is None:
+            data = graph.pipe(format=format)
+            self.put(key, data)
+        return data
+
+    def render_file(self, graph, filename:str, format:Optional[str] = None) -> str:
+        """
+        Write the rendered graph to ``<filename>.<format>``, like ``graph.render(filename)``
+        but without keeping the DOT source file, and return the path written.
+        """
+        format = format or graph.format
+        path = f"{filename}.{format}"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.render(graph, format))
+        return path
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def _remember(self, key:str, data:bytes):
+        # Outputs larger than the whole memory tier only go to disk
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while len(self._memory) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.stats.evictions += 1
+
+    def _entries(self) -> list[os.DirEntry]:
+        if self.directory is None:
+            return []
+        with os.scandir(self.directory) as it:
+            return [entry for entry in it if entry.name.endswith(_SUFFIX)]
+
+    @staticmethod
+    def _remove(path:str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        if total <= self.max_disk_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            self._remove(path)
+            total -= size
+            with self._lock:
+                self.stats.evictions += 1
+
+_default_render_cache: Optional[RenderCache] = None
+
+def default_render_cache() -> RenderCache:
+    """
+    Return the process-wide render cache shared by the web app, the notebooks and batch renders.
+
+    Its on-disk tier lives in ``LOG_TO_GRAPH_RENDER_CACHE_DIR`` or ``~/.cache/log_to_graph/renders``.
+    """
+    global _default_render_cache
+    if _default_render_cache is None:
+        _default_render_cache = RenderCache(os.getenv("LOG_TO_GRAPH_RENDER_CACHE_DIR", DEFAULT_RENDER_CACHE_DIR))
+    return _default_render_cache
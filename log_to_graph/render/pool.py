@@ -0,0 +1,244 @@
+import itertools
+import os
+import queue
+import subprocess
+import threading
+from concurrent.futures import Future
+from typing import Optional
+from graphviz import ExecutableNotFound
+from .cache import RenderCache, default_render_cache
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_TIMEOUT = 30.0  # seconds per layout attempt
+
+# Lower runs first: someone waiting on a page beats a batch export
+INTERACTIVE = 0
+BATCH = 10
+
+# The fallback gives up on dot's ranked layout altogether: sfdp's multilevel
+# force-directed layout scales to large graphs, ignores clusters and ranks, and
+# with splines=false edges are drawn straight without any routing
+DEFAULT_FALLBACK_ENGINE = "sfdp"
+DEFAULT_FALLBACK_GRAPH_ATTR = {"splines": "false"}
+
+class RenderTimeoutError(TimeoutError):
+    """
+    Raised when neither the layout nor its fallback finished within the time budget.
+    """
+
+def _run_graphviz(source:str, engine:str, format:str, timeout:Optional[float]) -> bytes:
+    cmd = ["dot", f"-K{engine}", f"-T{format}"]
+    try:
+        # run() kills the process once the timeout is exceeded
+        proc = subprocess.run(cmd, input=source.encode("utf-8"), capture_output=True,
+                              timeout=timeout, check=True)
+    except FileNotFoundError as e:
+        raise ExecutableNotFound(cmd) from e
+    return proc.stdout
+
+def _run_unflatten(source:str, options:dict, timeout:Optional[float]) -> str:
+    # Same options as graphviz's unflatten(): stagger, fanout and chain
+    cmd = ["unflatten"]
+    if options.get("stagger"):
+        cmd += ["-l", str(options["stagger"])]
+    if options.get("fanout"):
+        cmd.append("-f")
+    if options.get("chain"):
+        cmd += ["-c", str(options["chain"])]
+    try:
+        proc = subprocess.run(cmd, input=source.encode("utf-8"), capture_output=True,
+                              timeout=timeout, check=True)
+    except FileNotFoundError as e:
+        raise ExecutableNotFound(cmd) from e
+    return proc.stdout.decode("utf-8")
+
+class _Job:
+    # The source is taken when the job is queued, later changes to the graph don't leak in
+    __slots__ = ("source", "engine", "format", "timeout", "unflatten", "future")
+
+    def __init__(self, graph, format:str, timeout:Optional[float], unflatten:Optional[dict]):
+        self.source: str = graph.source
+        self.engine: str = graph.engine
+        self.format = format
+        self.timeout = timeout
+        self.unflatten = unflatten
+        self.future: Future = Future()
+
+    def key(self) -> str:
+        return RenderCache.key(self.source, self.format, self.engine, self.unflatten)
+
+class RenderPool:
+    """
+    A fixed number of render workers fed from a priority queue.
+
+    At most ``workers`` Graphviz processes run at a time, whatever the number
+    of callers, and queued jobs are taken lowest ``priority`` first. Each
+    layout gets ``timeout`` seconds; when it runs over, the process is killed
+    and the chart is laid out again with ``fallback_engine`` and
+    ``fallback_graph_attr``, within a second budget. Results are stored in
+    ``cache``; a fallback layout is stored under the key of the fallback
+    source, not the chart's own, so it never stands in for the full layout
+    later, but a chart that times out again reuses it instead of redoing it.
+
+    Given ``unflatten`` options, a job runs Graphviz's unflatten on the source
+    before the layout, in the worker and only on a cache miss; the cache key
+    is the original source plus those options. An unflatten that runs over
+    the timeout is skipped and the source laid out as it is.
+    """
+
+    def __init__(self, workers:int = DEFAULT_WORKERS,
+                 timeout:Optional[float] = DEFAULT_TIMEOUT,
+                 cache:Optional[RenderCache] = None,
+                 fallback_engine:Optional[str] = None,
+                 fallback_graph_attr:Optional[dict] = None,
+                 fallback_timeout:Optional[float] = None):
+        """
+        :param workers: Number of layouts run at the same time.
+        :param timeout: Default budget in seconds for one layout, ``None`` for no limit.
+        :param cache: Render cache consulted before queueing and filled after rendering.
+        :param fallback_engine: Layout engine for the fallback, defaults to sfdp.
+        :param fallback_graph_attr: Graph attributes applied for the fallback, defaults to unrouted edges.
+        :param fallback_timeout: Budget for the fallback, defaults to the job's timeout.
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.fallback_engine = DEFAULT_FALLBACK_ENGINE if fallback_engine is None else fallback_engine
+        self.fallback_graph_attr = DEFAULT_FALLBACK_GRAPH_ATTR if fallback_graph_attr is None else fallback_graph_attr
+        self.fallback_timeout = fallback_timeout
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        # Tie-breaker so jobs of equal priority run in submission order
+        self._sequence = itertools.count()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"log_to_graph-render-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, graph, format:Optional[str] = None, priority:int = INTERACTIVE,
+               timeout:Optional[float] = None, unflatten:Optional[dict] = None) -> Future:
+        """
+        Queue a ``graphviz`` graph for rendering and return a Future of the output bytes.
+
+        Cancelling the Future before a worker picks the job up drops it from the queue.
+
+        :param unflatten: Options for an unflatten pass before the layout, e.g. a chart's ``Layout.unflatten``.
+        """
+        if self._closed:
+            raise RuntimeError("render pool is closed")
+        job = _Job(graph, format or graph.format, self.timeout if timeout is None else timeout, unflatten)
+        if self.cache is not None:
+            data = self.cache.get(job.key())
+            if data is not None:
+                job.future.set_result(data)
+                return job.future
+        self._queue.put((priority, next(self._sequence), job))
+        return job.future
+
+    def render(self, graph, format:Optional[str] = None, priority:int = INTERACTIVE,
+               timeout:Optional[float] = None, unflatten:Optional[dict] = None) -> bytes:
+        return self.submit(graph, format, priority, timeout, unflatten).result()
+
+    def render_file(self, graph, filename:str, format:Optional[str] = None, priority:int = BATCH,
+                    timeout:Optional[float] = None, unflatten:Optional[dict] = None) -> str:
+        """
+        Write the rendered graph to ``<filename>.<format>`` and return the path written.
+        """
+        format = format or graph.format
+        path = f"{filename}.{format}"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = self.render(graph, format, priority, timeout, unflatten)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def _fallback_source(self, source:str) -> str:
+        # A root graph attribute set again at the end of the graph overrides the
+        # earlier value, which works for Digraph and Source (e.g. unflattened) alike
+        if not self.fallback_graph_attr:
+            return source
+        attrs = " ".join(f'{name}="{value}"' for name, value in self.fallback_graph_attr.items())
+        end = source.rfind("}")
+        return f"{source[:end]}\tgraph [{attrs}]\n{source[end:]}"
+
+    # Returns the output and the cache key it belongs to, the fallback's own when it was used
+    def _render(self, job:_Job) -> tuple:
+        source = job.source
+        if job.unflatten is not None:
+            try:
+                source = _run_unflatten(source, job.unflatten, job.timeout)
+            except subprocess.TimeoutExpired:
+                pass
+        try:
+            return _run_graphviz(source, job.engine, job.format, job.timeout), job.key()
+        except subprocess.TimeoutExpired:
+            pass
+        source = self._fallback_source(job.source)
+        key = RenderCache.key(source, job.format, self.fallback_engine)
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                return data, key
+        fallback_timeout = job.timeout if self.fallback_timeout is None else self.fallback_timeout
+        try:
+            return _run_graphviz(source, self.fallback_engine, job.format, fallback_timeout), key
+        except subprocess.TimeoutExpired as e:
+            raise RenderTimeoutError(
+                f"rendering did not finish within {job.timeout}s, nor its fallback within {fallback_timeout}s"
+            ) from e
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                data, key = self._render(job)
+            except BaseException as e:
+                job.future.set_exception(e)
+                continue
+            if self.cache is not None:
+                try:
+                    self.cache.put(key, data)
+                except OSError:
+                    # A full or read-only cache directory must not fail the render
+                    pass
+            job.future.set_result(data)
+
+    def close(self, wait:bool = True):
+        """
+        Stop the workers once the jobs already queued have run.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        # Sentinels sort after every real job
+        for _ in self._threads:
+            self._queue.put((float("inf"), next(self._sequence), None))
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_default_render_pool: Optional[RenderPool] = None
+_default_render_pool_lock = threading.Lock()
+
+def default_render_pool() -> RenderPool:
+    """
+    Return the process-wide render pool, backed by the shared render cache.
+    """
+    global _default_render_pool
+    with _default_render_pool_lock:
+        if _default_render_pool is None:
+            _default_render_pool = RenderPool(cache=default_render_cache())
+        return _default_render_pool
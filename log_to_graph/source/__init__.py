@@ -0,0 +1,9 @@
+from .source import EventSource
+from .humio_source import HumioEventSource
+from .file_source import FileEventSource
+
+__all__ = [
+    'EventSource',
+    'HumioEventSource',
+    'FileEventSource',
+]
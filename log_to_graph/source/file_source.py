@@ -0,0 +1,102 @@
+import codecs
+import json
+import mmap
+import os
+from typing import Iterator, Optional, Sequence
+from ..flowchart.node.node import NODE_FIELDS, project_event
+from .source import EventSource
+
+# Bytes decoded at a time when the export is not one event per line
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+class FileEventSource(EventSource):
+    """
+    Events read from an exported NDJSON or JSON file.
+
+    The file is memory-mapped and parsed one record at a time, so exports much
+    larger than memory can be scanned at disk speed. Three layouts are accepted:
+    NDJSON (one event per line), a JSON array of events, and one or more
+    concatenated JSON objects such as ``example_event.json``.
+    """
+
+    def __init__(self, path:str, fields:Optional[Sequence[str]] = NODE_FIELDS,
+                 chunk_size:int = DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.fields = fields
+        self.chunk_size = chunk_size
+
+    def iter_events(self, correlation_id:Optional[str] = None) -> Iterator[dict]:
+        if os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for event in self._parse(mm, correlation_id):
+                if correlation_id is None or event.get("correlation_id") == correlation_id:
+                    yield project_event(event, self.fields)
+
+    def _parse(self, mm:mmap.mmap, correlation_id:Optional[str]) -> Iterator[dict]:
+        start = _skip_whitespace(mm, 0)
+        if start == len(mm):
+            return
+        if mm[start:start + 1] == b"[":
+            yield from _parse_json_stream(mm, start + 1, self.chunk_size)
+            return
+
+        first_line = mm[start:_line_end(mm, start)]
+        try:
+            json.loads(first_line)
+        except ValueError:
+            # Not one object per line, e.g. a pretty-printed event
+            yield from _parse_json_stream(mm, start, self.chunk_size)
+            return
+        yield from _parse_ndjson(mm, start, correlation_id)
+
+def _skip_whitespace(mm:mmap.mmap, pos:int) -> int:
+    size = len(mm)
+    while pos < size and mm[pos] in b" \t\r\n,":
+        pos += 1
+    return pos
+
+def _line_end(mm:mmap.mmap, pos:int) -> int:
+    end = mm.find(b"\n", pos)
+    return len(mm) if end == -1 else end
+
+def _parse_ndjson(mm:mmap.mmap, pos:int, correlation_id:Optional[str]) -> Iterator[dict]:
+    # Lines that can't contain the correlation ID are skipped without being decoded
+    needle = correlation_id.encode("utf-8") if correlation_id else None
+    size = len(mm)
+    while pos < size:
+        end = _line_end(mm, pos)
+        line = mm[pos:end]
+        pos = end + 1
+        if needle is not None and needle not in line:
+            continue
+        if line.strip():
+            yield json.loads(line)
+
+def _parse_json_stream(mm:mmap.mmap, pos:int, chunk_size:int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    # Decodes consecutive JSON values, reading the map in chunk_size slices and
+    # only growing the buffer while a value straddles a chunk boundary.
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    size = len(mm)
+    buffer = ""
+    while True:
+        offset = 0
+        while True:
+            while offset < len(buffer) and buffer[offset] in " \t\r\n,":
+                offset += 1
+            if offset < len(buffer) and buffer[offset] == "]":
+                return
+            try:
+                value, offset = decoder.raw_decode(buffer, offset)
+            except ValueError:
+                break
+            yield value
+        buffer = buffer[offset:]
+        if pos >= size:
+            if buffer.strip():
+                raise ValueError(f"Invalid or truncated JSON in export: {buffer[:80]!r}")
+            return
+        chunk = mm[pos:pos + chunk_size]
+        pos += len(chunk)
+        buffer += utf8.decode(chunk, final=pos >= size)
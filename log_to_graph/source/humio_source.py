@@ -0,0 +1,27 @@
+from typing import Iterator, Optional, Sequence
+from ..flowchart.node.node import NODE_FIELDS
+from ..humio.cache import EventCache
+from ..humio.query import iter_events
+from .source import EventSource
+
+class HumioEventSource(EventSource):
+    """
+    Events queried from a Humio repository.
+    """
+
+    def __init__(self, user_token:str, repo:str, start:str,
+                 base_url:Optional[str] = None,
+                 cache:Optional[EventCache] = None,
+                 fields:Optional[Sequence[str]] = NODE_FIELDS):
+        self.user_token = user_token
+        self.repo = repo
+        self.start = start
+        self.base_url = base_url
+        self.cache = cache
+        self.fields = fields
+
+    def iter_events(self, correlation_id:Optional[str] = None) -> Iterator[dict]:
+        if correlation_id is None:
+            raise ValueError("Humio queries need a correlation_id")
+        return iter_events(self.user_token, self.repo, self.start, correlation_id,
+                           base_url=self.base_url, cache=self.cache, fields=self.fields)
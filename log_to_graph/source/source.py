@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+from ..humio.query import group_by_correlation_id
+
+class EventSource(ABC):
+    """
+    Where log events come from.
+
+    Implementations only need to provide :meth:`iter_events`, everything that
+    builds graphs consumes events through this interface.
+    """
+
+    @abstractmethod
+    def iter_events(self, correlation_id:Optional[str] = None) -> Iterator[dict]:
+        """
+        Yield the events for a correlation ID, or every event when it is ``None``.
+        """
+
+    def query(self, correlation_id:Optional[str] = None) -> dict[str,list]:
+        """
+        Return the events grouped by correlation ID, the same shape as ``query_logs``.
+        """
+        return group_by_correlation_id(self.iter_events(correlation_id))
@@ -0,0 +1,13 @@
+import pytest
+
+from log_to_graph.humio import close_clients
+from tests.fake_humio import FakeHumio
+
+
+@pytest.fixture
+def humio():
+    server = FakeHumio().start()
+    yield server
+    # Pooled clients are keyed by base URL, drop them with the server
+    close_clients()
+    server.stop()
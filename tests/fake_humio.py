@@ -0,0 +1,130 @@
+"""
+A local stand-in for the parts of Humio's REST API the query layer uses.
+
+Query jobs are created with POST, polled with GET and deleted with DELETE.
+The first poll of a job reports it as still running, the next ones return the
+events registered for the correlation IDs in the query string. With
+``windowed`` set, only events inside the job's relative time window are returned.
+"""
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from log_to_graph.humio.query import parse_relative_time
+
+_SEARCH = re.compile(r"join\(\{\(?(.*?)\)? class=\*")
+
+
+def make_event(correlation_id, index, **fields):
+    event = {
+        "@id": f"{correlation_id}-{index}",
+        "@timestamp": 1745329533732 + index * 10,
+        "class": f"com.starlingbank.a.C{index}",
+        "level": "INFO",
+        "message": f"event {index}",
+        "service": "svc",
+        "engineering_group": "Lending",
+        "correlation_id": correlation_id,
+    }
+    event.update(fields)
+    return event
+
+
+class FakeHumio(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.events = {}  # correlation_id -> events returned once the job is done
+        self.delays = {}  # correlation_id -> seconds each poll of its job takes
+        self.create_delay = 0  # seconds each job creation takes
+        self.failures = []  # status codes for the next polls in order, None answers normally
+        self.segments = 1  # done polls a job takes to deliver its events, each returns all of them
+        self.poll_after = 10  # pollAfter in milliseconds
+        self.windowed = False  # honour each job's start, for events with current timestamps
+        self.jobs = {}  # job id -> [query string, polls so far, start]
+        self.deleted = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def correlation_ids(self, query):
+        match = _SEARCH.search(query)
+        return match.group(1).split(" or ") if match else []
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeHumio
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if self.server.create_delay:
+            time.sleep(self.server.create_delay)
+        with self.server._lock:
+            job_id = str(next(self.server._ids))
+            self.server.jobs[job_id] = [body["queryString"], 0, body.get("start")]
+        self._send(200, json.dumps({"id": job_id}).encode())
+
+    def do_GET(self):
+        server = self.server
+        with server._lock:
+            failure = server.failures.pop(0) if server.failures else None
+        if failure is not None:
+            self._send(failure, b"error", "text/plain")
+            return
+        job_id = self.path.rsplit("/", 1)[-1]
+        with server._lock:
+            job = server.jobs.get(job_id)
+            if job is not None:
+                job[1] += 1
+        if job is None:
+            self._send(404, b"no such job", "text/plain")
+            return
+        query, polls, start = job
+        ids = server.correlation_ids(query)
+        delay = max((server.delays.get(correlation_id, 0) for correlation_id in ids), default=0)
+        if delay:
+            time.sleep(delay)
+        done = polls > 1
+        more = done and polls - 1 < server.segments
+        events = [event for correlation_id in ids for event in server.events.get(correlation_id, [])]
+        if server.windowed and start:
+            oldest = time.time() * 1000 - parse_relative_time(start)
+            events = [event for event in events if event["@timestamp"] >= oldest]
+        response = {
+            "done": done,
+            "cancelled": False,
+            "events": events if done else [],
+            "metaData": {"pollAfter": server.poll_after, "isAggregate": False,
+                         "extraData": {"hasMoreEvents": "true" if more else "false"}},
+        }
+        self._send(200, json.dumps(response).encode())
+
+    def do_DELETE(self):
+        self.server.deleted.append(self.path.rsplit("/", 1)[-1])
+        self._send(204)
@@ -0,0 +1,59 @@
+import time
+
+from log_to_graph.humio import ADAPTIVE, iter_events_adaptive, query_logs, trace_looks_complete
+from tests.fake_humio import make_event
+
+HOUR_MS = 60 * 60 * 1000
+
+
+def _hours_ago(correlation_id, index, hours):
+    return make_event(correlation_id, index, **{"@timestamp": time.time() * 1000 - hours * HOUR_MS})
+
+
+def _search(humio, windows=("3h", "12h", "1d")):
+    humio.windowed = True
+    events = iter_events_adaptive("token", "repo", "abc123", windows=windows, base_url=humio.base_url)
+    return sorted(event["message"] for event in events)
+
+
+def test_trace_looks_complete():
+    now = 100 * HOUR_MS
+    assert trace_looks_complete([{"@timestamp": now - HOUR_MS}], "3h", now_ms=now)
+    assert not trace_looks_complete([{"@timestamp": now - 2.9 * HOUR_MS}], "3h", now_ms=now)
+    assert not trace_looks_complete([], "3h", now_ms=now)
+
+
+def test_stops_at_the_first_window_that_looks_complete(humio):
+    humio.events = {"abc123": [_hours_ago("abc123", 0, 1), _hours_ago("abc123", 1, 0.5)]}
+
+    assert _search(humio) == ["event 0", "event 1"]
+    assert len(humio.jobs) == 1
+
+
+def test_widens_when_the_oldest_event_is_near_the_window_start(humio):
+    humio.events = {"abc123": [_hours_ago("abc123", 0, 5), _hours_ago("abc123", 1, 2.9)]}
+
+    assert _search(humio) == ["event 0", "event 1"]
+    assert [job[2] for job in humio.jobs.values()] == ["3h", "12h"]
+
+
+def test_falls_back_to_the_widest_window_that_found_events(humio):
+    humio.events = {"abc123": [_hours_ago("abc123", 0, 11.9), _hours_ago("abc123", 1, 2.95)]}
+
+    assert _search(humio, windows=("1h", "3h", "12h")) == ["event 0", "event 1"]
+    assert len(humio.jobs) == 3
+
+
+def test_nothing_found_in_any_window(humio):
+    assert _search(humio, windows=("1h", "3h")) == []
+    assert len(humio.jobs) == 2
+
+
+def test_auto_start_searches_adaptively(humio):
+    humio.windowed = True
+    humio.events = {"abc123": [_hours_ago("abc123", 0, 5)]}
+
+    event_map = query_logs("token", "repo", ADAPTIVE, "abc123", base_url=humio.base_url)
+
+    assert len(event_map["abc123"]) == 1
+    assert [job[2] for job in humio.jobs.values()] == ["3h", "12h"]
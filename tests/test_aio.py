@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from log_to_graph.humio import QueryFailedError, async_query_logs
+from tests.fake_humio import make_event
+
+
+def _run(humio, ids, **kwargs):
+    return asyncio.run(async_query_logs("token", "repo", "3h", ids, base_url=humio.base_url, **kwargs))
+
+
+def test_queries_every_correlation_id(humio):
+    humio.events = {"aaa111": [make_event("aaa111", i) for i in range(3)],
+                    "bbb222": [make_event("bbb222", i) for i in range(2)]}
+
+    event_map = _run(humio, ["aaa111", "bbb222"])
+
+    assert {cid: len(events) for cid, events in event_map.items()} == {"aaa111": 3, "bbb222": 2}
+    assert len(humio.jobs) == 2
+
+
+def test_timeout_only_drops_the_slow_job(humio):
+    humio.events = {"fast01": [make_event("fast01", 0)], "slow02": [make_event("slow02", 0)]}
+    humio.delays = {"slow02": 1.0}
+    errors = {}
+
+    event_map = _run(humio, ["fast01", "slow02"], timeout=0.5, allow_partial=True, errors=errors)
+
+    assert list(event_map) == ["fast01"]
+    assert list(errors) == ["slow02"]
+    assert isinstance(errors["slow02"], asyncio.TimeoutError)
+
+
+def test_failure_raises_with_the_completed_jobs(humio):
+    humio.events = {"fast01": [make_event("fast01", 0)], "slow02": [make_event("slow02", 0)]}
+    humio.delays = {"slow02": 1.0}
+
+    with pytest.raises(QueryFailedError) as raised:
+        _run(humio, ["fast01", "slow02"], timeout=0.5)
+
+    assert list(raised.value.partial) == ["fast01"]
+    assert raised.value.stats.events == 1
+
+
+def test_timed_out_job_is_deleted_on_humio(humio):
+    humio.delays = {"slow02": 1.0}
+
+    _run(humio, ["slow02"], timeout=0.2, allow_partial=True)
+
+    assert humio.deleted == ["0"]
+
+
+def test_job_created_after_the_timeout_is_deleted_on_humio(humio):
+    humio.create_delay = 0.5
+
+    _run(humio, ["slow02"], timeout=0.2, allow_partial=True)
+
+    assert list(humio.jobs) == ["0"]
+    assert humio.deleted == ["0"]
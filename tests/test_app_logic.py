@@ -0,0 +1,34 @@
+from log_to_graph.flowchart import DEFAULT_THEME
+from log_to_graph.source import EventSource
+from tests.fake_humio import make_event
+from web import app_logic
+
+
+class _Source(EventSource):
+    def __init__(self, events):
+        self.events = events
+
+    def iter_events(self, correlation_id=None):
+        return iter(self.events)
+
+
+class _Pool:
+    def __init__(self):
+        self.jobs = []
+
+    def render(self, graph, format=None, unflatten=None):
+        self.jobs.append((graph, unflatten))
+        return b"<svg/>"
+
+
+def test_web_render_hands_the_layout_unflatten_to_the_pool(monkeypatch):
+    pool = _Pool()
+    monkeypatch.setattr(app_logic, "default_render_pool", lambda: pool)
+
+    svg = app_logic.generate_flowchart_svg_from_source(
+        _Source([make_event("abc123", i) for i in range(3)]), "abc123", DEFAULT_THEME)
+
+    assert svg == "<svg/>"
+    [(graph, unflatten)] = pool.jobs
+    assert unflatten == {"stagger": 3}
+    assert graph.source.startswith("digraph {")
@@ -0,0 +1,65 @@
+import pytest
+
+from log_to_graph.humio import iter_events_batch, query_logs_batch
+from log_to_graph.humio.query import _build_query
+from tests.fake_humio import make_event
+
+
+def _events(humio, *correlation_ids):
+    humio.events = {cid: [make_event(cid, i) for i in range(2)] for cid in correlation_ids}
+
+
+def _batch(humio, ids, **kwargs):
+    return query_logs_batch("token", "repo", "3h", ids, base_url=humio.base_url, **kwargs)
+
+
+def test_single_id_keeps_the_original_query_shape():
+    assert _build_query(["aaa111"]) == " join({aaa111 class=* service=*}, field=correlation_id)"
+
+
+def test_several_ids_are_or_joined_in_one_search():
+    query = _build_query(["aaa111", "bbb222"], fields=["message"])
+
+    assert query == (" join({(aaa111 or bbb222) class=* service=*}, field=correlation_id)"
+                     " | select([message, @id])")
+
+
+def test_ids_are_grouped_into_chunks(humio):
+    _events(humio, "aaa111", "bbb222", "ccc333", "ddd444")
+
+    event_map = _batch(humio, ["aaa111", "bbb222", "ccc333", "ddd444"], chunk_size=2)
+
+    assert [humio.correlation_ids(query) for query, _, _ in humio.jobs.values()] == [
+        ["aaa111", "bbb222"], ["ccc333", "ddd444"]]
+    assert {cid: len(events) for cid, events in event_map.items()} == {
+        "aaa111": 2, "bbb222": 2, "ccc333": 2, "ddd444": 2}
+
+
+def test_last_chunk_holds_the_remainder(humio):
+    _events(humio, "aaa111", "bbb222", "ccc333")
+
+    _batch(humio, ["aaa111", "bbb222", "ccc333"], chunk_size=2)
+
+    assert [humio.correlation_ids(query) for query, _, _ in humio.jobs.values()] == [
+        ["aaa111", "bbb222"], ["ccc333"]]
+
+
+def test_duplicate_ids_are_queried_once(humio):
+    _events(humio, "aaa111", "bbb222")
+
+    event_map = _batch(humio, ["aaa111", "bbb222", "aaa111"], chunk_size=2)
+
+    assert len(humio.jobs) == 1
+    assert humio.correlation_ids(next(iter(humio.jobs.values()))[0]) == ["aaa111", "bbb222"]
+    assert len(event_map["aaa111"]) == 2
+
+
+def test_no_ids_creates_no_job(humio):
+    assert _batch(humio, []) == {}
+    assert humio.jobs == {}
+
+
+def test_chunk_size_must_be_positive(humio):
+    with pytest.raises(ValueError):
+        list(iter_events_batch("token", "repo", "3h", ["aaa111"], chunk_size=0, base_url=humio.base_url))
+    assert humio.jobs == {}
@@ -0,0 +1,111 @@
+import os
+import time
+
+import pytest
+
+from log_to_graph.flowchart.node import NODE_FIELDS
+from log_to_graph.humio import EventCache, query_logs
+from tests.fake_humio import FakeHumio, make_event
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EventCache(str(tmp_path))
+
+
+def _recent_event(correlation_id, index):
+    return make_event(correlation_id, index, **{"@timestamp": time.time() * 1000})
+
+
+def test_settled_result_is_replayed(cache):
+    events = [make_event("abc123", i) for i in range(3)]
+
+    assert cache.put("repo", "abc123", "3h", events)
+
+    assert cache.get("repo", "abc123", "3h") == events
+    assert cache.stats.hits == 1
+
+
+def test_key_includes_fields(cache):
+    cache.put("repo", "abc123", "3h", [make_event("abc123", 0)], fields=["message"])
+
+    assert cache.get("repo", "abc123", "3h") is None
+    assert cache.get("repo", "abc123", "3h", fields=["message"]) is not None
+
+
+def test_empty_result_is_not_cached(cache):
+    assert not cache.put("repo", "abc123", "3h", [])
+    assert cache.get("repo", "abc123", "3h") is None
+
+
+def test_trace_still_running_is_not_cached(cache):
+    events = [make_event("abc123", 0), _recent_event("abc123", 1)]
+
+    assert not cache.put("repo", "abc123", "3h", events)
+    assert cache.get("repo", "abc123", "3h") is None
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = EventCache(str(tmp_path), ttl=0)
+    cache.put("repo", "abc123", "3h", [make_event("abc123", 0)])
+    time.sleep(0.01)
+
+    assert cache.get("repo", "abc123", "3h") is None
+    assert cache.stats.expirations == 1
+    assert cache.size() == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = EventCache(str(tmp_path))
+    for index, correlation_id in enumerate(["aaa", "bbb", "ccc"]):
+        cache.put("repo", correlation_id, "3h", [make_event(correlation_id, 0)])
+        path = os.path.join(cache.directory, cache.key("repo", correlation_id, "3h") + ".json.gz")
+        os.utime(path, (1000 + index, 1000 + index))
+    # Reading "aaa" makes "bbb" the least recently used entry
+    cache.get("repo", "aaa", "3h")
+    # Room for the three entries plus half of one, so the fourth evicts exactly one
+    cache.max_bytes = cache.size() + cache.size() // 6
+
+    cache.put("repo", "ddd", "3h", [make_event("ddd", 0)])
+
+    assert cache.get("repo", "bbb", "3h") is None
+    assert cache.get("repo", "aaa", "3h") is not None
+    assert cache.stats.evictions == 1
+
+
+def test_query_before_ingest_is_not_served_from_cache(humio, cache):
+    assert query_logs("token", "repo", "3h", "abc123", base_url=humio.base_url, cache=cache) == {}
+
+    humio.events = {"abc123": [make_event("abc123", i) for i in range(2)]}
+    event_map = query_logs("token", "repo", "3h", "abc123", base_url=humio.base_url, cache=cache)
+
+    assert len(event_map["abc123"]) == 2
+    assert len(humio.jobs) == 2
+
+    query_logs("token", "repo", "3h", "abc123", base_url=humio.base_url, cache=cache)
+    assert len(humio.jobs) == 2
+
+
+def test_instances_do_not_share_results(humio, cache):
+    other = FakeHumio().start()
+    try:
+        humio.events = {"abc123": [make_event("abc123", i, message="from A") for i in range(2)]}
+        other.events = {"abc123": [make_event("abc123", 0, message="from B")]}
+
+        first = query_logs("token", "repo", "3h", "abc123", base_url=humio.base_url, cache=cache)
+        second = query_logs("token", "repo", "3h", "abc123", base_url=other.base_url, cache=cache)
+
+        assert [event["message"] for event in first["abc123"]] == ["from A", "from A"]
+        assert [event["message"] for event in second["abc123"]] == ["from B"]
+        assert len(other.jobs) == 1
+    finally:
+        other.stop()
+
+
+def test_default_instance_comes_from_the_environment(humio, cache, monkeypatch):
+    humio.events = {"abc123": [make_event("abc123", 0)]}
+    monkeypatch.setenv("HUMIO_BASE_URL", humio.base_url)
+
+    query_logs("token", "repo", "3h", "abc123", cache=cache)
+
+    assert cache.get("repo", "abc123", "3h", fields=NODE_FIELDS, base_url=humio.base_url) is not None
@@ -0,0 +1,65 @@
+from log_to_graph.flowchart import node_factory
+from log_to_graph.flowchart.node.dtopp import dto_pp, format_dto
+from tests.fake_humio import make_event
+
+
+def test_fields_go_on_their_own_lines():
+    assert format_dto("Foo{a=1, bar=Bar{b=2}}").split("\\l") == [
+        "Foo{", "    a=1,", "    bar=Bar{", "        b=2", "    }", "}",
+    ]
+
+
+def test_long_dto_is_formatted_without_recursion():
+    items = ", ".join(f"Item{{id={i}, v=Value{{x={i}}}}}" for i in range(400))
+    dto = f"Big{{items=[{items}]}}"
+    assert len(dto) > 5000
+
+    formatted = format_dto(dto, max_length=None)
+
+    assert formatted.startswith("Big{\\l")
+    assert formatted.count("Item{") == 400
+
+
+def test_deep_nesting_is_collapsed_past_max_depth():
+    dto = "A{" * 5000 + "x=1" + "}" * 5000
+
+    formatted = format_dto(dto, max_length=None, max_depth=2)
+
+    assert formatted.count("{...}") == 1
+    assert "x=1" not in formatted
+    assert formatted.endswith("}")
+    assert formatted.count("{") == 3
+
+
+def test_output_is_capped_at_max_length():
+    dto = "Foo{" + ", ".join(f"field{i}=value{i}" for i in range(1000)) + "}"
+
+    formatted = format_dto(dto, max_length=200)
+
+    assert formatted.endswith("...")
+    assert len(formatted) <= 200 + len("...")
+
+
+def test_truncation_never_splits_a_line_break():
+    for max_length in range(1, 40):
+        formatted = format_dto("A{b=1, c=Cc{d=2}}", max_length=max_length)
+        body = formatted[:-3] if formatted.endswith("...") else formatted
+        assert not body.endswith("\\"), max_length
+        assert body.count("\\") == body.count("\\l")
+
+    assert format_dto("A{b=1}", max_length=3) == "A..."
+
+
+def test_dto_is_extracted_from_the_message():
+    assert dto_pp("Saving AuthRequest{id=1}") == "AuthRequest{\\l    id=1\\l}"
+    assert dto_pp("no dto here") is None
+
+
+def test_auth_request_note_with_a_huge_dto():
+    message = "Saving AuthRequest{" + "a=" * 3000 + "A{" * 3000 + "}" * 3000 + "}"
+    node = node_factory(make_event(
+        "abc123", 0, message=message,
+        **{"class": "com.starlingbank.cardprocessor.workflow.auth.handlers.AuthRequestSaveHandler"}))
+
+    assert node.dto().startswith("AuthRequest{\\l")
+    assert len(node.dto()) <= 4000 + len("...")
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from log_to_graph.source import FileEventSource
+from tests.fake_humio import make_event
+
+
+EVENTS = [
+    make_event("abc123", 0, message="zoë ordered crème brûlée 🍮"),
+    make_event("abc123", 1, message="line one\n\tat com.starlingbank.Foo(Foo.java:1)"),
+    make_event("def456", 2, message="日本語のメッセージ"),
+]
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "export.json"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def _read(path, correlation_id=None, **kwargs):
+    return list(FileEventSource(path, fields=None, **kwargs).iter_events(correlation_id))
+
+
+def test_ndjson(tmp_path):
+    path = _write(tmp_path, "\n".join(json.dumps(event, ensure_ascii=False) for event in EVENTS) + "\n")
+
+    assert _read(path) == EVENTS
+
+
+def test_ndjson_filters_by_correlation_id(tmp_path):
+    path = _write(tmp_path, "\n".join(json.dumps(event, ensure_ascii=False) for event in EVENTS))
+
+    assert _read(path, "def456") == EVENTS[2:]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+def test_json_array_across_chunk_boundaries(tmp_path, chunk_size):
+    # Small chunks split events, and the multi-byte characters inside them, at every offset
+    path = _write(tmp_path, json.dumps(EVENTS, ensure_ascii=False, indent=2))
+
+    assert _read(path, chunk_size=chunk_size) == EVENTS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_concatenated_pretty_printed_objects(tmp_path, chunk_size):
+    path = _write(tmp_path, "\n".join(json.dumps(event, ensure_ascii=False, indent=4) for event in EVENTS))
+
+    assert _read(path, chunk_size=chunk_size) == EVENTS
+    assert _read(path, "abc123", chunk_size=chunk_size) == EVENTS[:2]
+
+
+def test_projects_fields(tmp_path):
+    path = _write(tmp_path, json.dumps(EVENTS))
+
+    events = list(FileEventSource(path, fields=["message"]).iter_events())
+
+    assert events == [{"message": event["message"]} for event in EVENTS]
+
+
+def test_empty_file(tmp_path):
+    assert _read(_write(tmp_path, "")) == []
+    assert _read(_write(tmp_path, "  \n")) == []
+
+
+def test_truncated_export_raises(tmp_path):
+    path = _write(tmp_path, json.dumps(EVENTS, indent=2)[:-40])
+
+    with pytest.raises(ValueError):
+        _read(path, chunk_size=16)
+
+
+def test_query_groups_by_correlation_id(tmp_path):
+    path = _write(tmp_path, json.dumps(EVENTS))
+
+    event_map = FileEventSource(path).query()
+
+    assert {cid: len(events) for cid, events in event_map.items()} == {"abc123": 2, "def456": 1}
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from log_to_graph.flowchart import FlowChart, NodeBatch, node_factory
+from log_to_graph.flowchart.node import RelativeTimeFormatter
+from tests.fake_humio import make_event
+
+NOW = datetime.fromtimestamp(1745329600)
+
+
+def _nodes(count=3, **fields):
+    return [node_factory(make_event("abc123", i, **fields)) for i in range(count)]
+
+
+def test_relative_times_are_formatted_on_first_read():
+    nodes = _nodes()
+    formatter = RelativeTimeFormatter(NOW)
+
+    FlowChart("abc123", nodes, time_formatter=formatter)
+
+    assert formatter._memo == {}
+    assert nodes[0].relative_time == formatter.format(nodes[0].timestamp)
+
+
+def test_humanize_output_false_uses_seconds():
+    nodes = _nodes()
+
+    FlowChart("abc123", nodes, now=NOW, humanize_output=False)
+
+    assert nodes[0].relative_time == "66s ago"
+
+
+# (class, level) per event: A is visited four times, B twice
+VISITS = [("A", "INFO"), ("B", "INFO"), ("A", "ERROR"), ("B", "WARN"), ("A", "ERROR"), ("A", "INFO")]
+
+
+def _repeating_nodes():
+    return [node_factory(make_event("abc123", i, level=level, **{"class": f"com.starlingbank.a.{name}"}))
+            for i, (name, level) in enumerate(VISITS)]
+
+
+def _source():
+    return FlowChart("abc123", _repeating_nodes(), relative_times=False).to_graphviz().source
+
+
+def test_each_node_id_is_declared_once():
+    source = _source()
+
+    assert source.count("\tsvc_A [") == 1
+    assert source.count("\tsvc_B [") == 1
+    assert source.count("\tsvc_A_error [") == 1
+    assert source.count("svc_A -> svc_A_error") == 1
+
+
+def test_notes_come_from_the_last_visit_with_that_level():
+    source = _source()
+
+    assert 'svc_A_error [label="event 4"' in source
+    assert 'svc_B_warn [label="event 3"' in source
+    assert "svc_A_warn" not in source
+
+
+def test_only_repeated_transitions_get_a_label():
+    source = _source()
+
+    assert "\tsvc_A -> svc_B [penwidth=2 xlabel=\"×2\n" in source
+    assert "\tsvc_A -> svc_A\n" in source
+    assert " label=\"×" not in source
+
+
+def _events():
+    return [make_event("abc123", i, level=level, **{"@timestamp": 2000 - i, "class": f"com.starlingbank.a.{name}"})
+            for i, (name, level) in enumerate(VISITS * 20)]
+
+
+def test_batch_renders_like_nodes():
+    from_nodes = FlowChart("abc123", [node_factory(event) for event in _events()], relative_times=False)
+    from_batch = FlowChart("abc123", NodeBatch.from_events(_events()), relative_times=False)
+
+    assert from_batch.to_graphviz().source == from_nodes.to_graphviz().source
+    assert from_batch.layout() == from_nodes.layout()
+
+
+def test_batch_only_builds_the_nodes_it_draws():
+    chart = FlowChart("abc123", NodeBatch.from_events(_events()))
+
+    chart.to_graphviz()
+
+    # Last visit of A and B, plus A's last ERROR and B's last WARN visit
+    assert sum(node is not None for node in chart._batch._nodes) == 4
+
+
+def test_adding_nodes_to_a_batch_chart():
+    chart = FlowChart("abc123", NodeBatch.from_events(_events()), relative_times=False)
+
+    chart.add_nodes([node_factory(make_event("abc123", 999, **{"@timestamp": 5000, "class": "com.starlingbank.a.C"}))])
+
+    assert len(chart.nodes) == len(VISITS) * 20 + 1
+    assert chart.end.className == "C"
+    assert "svc_C -> E" in chart.to_graphviz().source
@@ -0,0 +1,77 @@
+import pytest
+
+from log_to_graph.humio import LiveQuery, QueryFailedError, QueryStats, RetryPolicy
+from tests.fake_humio import make_event
+from web import app_logic
+
+FAST_RETRY = RetryPolicy(base_delay=0.01, max_delay=0.05)
+
+
+def _live(humio, **kwargs):
+    return LiveQuery("token", "repo", "abc123", base_url=humio.base_url, retry=FAST_RETRY, **kwargs)
+
+
+def test_each_event_is_delivered_once(humio):
+    humio.events = {"abc123": [make_event("abc123", i) for i in range(2)]}
+    with _live(humio) as live:
+        live.poll()  # The job is still starting
+        first = live.poll()
+        humio.events["abc123"].append(make_event("abc123", 2))
+        second = live.poll()
+        third = live.poll()
+
+    assert [event["message"] for event in first] == ["event 0", "event 1"]
+    assert [event["message"] for event in second] == ["event 2"]
+    assert third == []
+    # humiolib deletes live jobs again when they are garbage collected
+    assert set(humio.deleted) == {"0"}
+
+
+def test_transient_errors_are_retried(humio):
+    humio.events = {"abc123": [make_event("abc123", 0)]}
+    stats = QueryStats()
+    with _live(humio, stats=stats) as live:
+        live.poll()
+        humio.failures = [503, 500]
+        events = live.poll()
+
+    assert [event["message"] for event in events] == ["event 0"]
+    assert stats.retries == 2
+
+
+def test_expired_job_is_recreated_without_duplicates(humio):
+    humio.events = {"abc123": [make_event("abc123", 0)]}
+    stats = QueryStats()
+    with _live(humio, stats=stats) as live:
+        live.poll()
+        assert len(live.poll()) == 1
+        humio.failures = [404]
+        humio.events["abc123"].append(make_event("abc123", 1))
+        # The new job reports everything again once it is running
+        events = live.poll() + live.poll()
+
+    assert [event["message"] for event in events] == ["event 1"]
+    assert stats.restarts == 1
+    assert len(humio.jobs) == 2
+
+
+def test_gives_up_after_the_retry_budget(humio):
+    with _live(humio) as live:
+        humio.failures = [500] * 10
+        with pytest.raises(QueryFailedError):
+            live.poll()
+
+
+def test_watch_renders_what_arrived_during_the_last_debounce(humio, monkeypatch):
+    monkeypatch.setattr(app_logic, "_render_svg", lambda flowchart: len(flowchart.nodes))
+    humio.events = {"abc123": [make_event("abc123", 0)]}
+
+    renders = []
+    for rendered in app_logic.watch_flowchart_svg("token", "repo", "abc123", theme=None, debounce=60,
+                                                  poll_interval=0.05, duration=0.6,
+                                                  base_url=humio.base_url, retry=FAST_RETRY):
+        renders.append(rendered)
+        humio.events["abc123"].append(make_event("abc123", len(humio.events["abc123"])))
+
+    # The first render comes straight away, the debounce holds back the rest until the end
+    assert renders == [1, 2]
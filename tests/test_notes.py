@@ -0,0 +1,41 @@
+from log_to_graph.flowchart.node import NoteEngine
+
+
+class _Node:
+    pass
+
+
+class _Child(_Node):
+    pass
+
+
+def test_each_pattern_finds_its_own_match():
+    engine = NoteEngine()
+    engine.register(_Node, "a", r"foo (\w+)")
+    engine.register(_Node, "b", r"bar (\w+)")
+
+    assert engine.extract(_Node, "foo bar baz") == {"a": ("bar",), "b": ("baz",)}
+
+
+def test_patterns_may_reuse_group_names_and_flags():
+    engine = NoteEngine()
+    engine.register(_Node, "a", r"(?i)id=(?P<id>\d+)")
+    engine.register(_Node, "b", r"ref=(?P<id>\w+)")
+
+    assert engine.extract(_Node, "ID=12 ref=x9") == {"a": ("12",), "b": ("x9",)}
+
+
+def test_subclasses_inherit_patterns():
+    engine = NoteEngine()
+    engine.register(_Node, "a", r"foo (\w+)")
+    engine.register(_Child, "b", r"bar (\w+)")
+
+    assert engine.extract(_Child, "foo x bar y") == {"a": ("x",), "b": ("y",)}
+    assert engine.extract(_Node, "foo x bar y") == {"a": ("x",)}
+
+
+def test_no_match_gives_no_note():
+    engine = NoteEngine()
+    engine.register(_Node, "a", r"foo (\w+)")
+
+    assert engine.extract(_Node, "nothing here") == {}
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from log_to_graph.flowchart import node_factory_many, node_factory_parallel
+from tests.fake_humio import make_event
+
+
+def _events(count):
+    # Out of order, with ties, so sorting and merging are both exercised
+    return [make_event("abc123", i, **{"@timestamp": 1000 + (i * 7) % 50}) for i in range(count)]
+
+
+def _key(nodes):
+    return [(node.timestamp, node.message) for node in nodes]
+
+
+def test_without_an_executor_nodes_are_built_serially_in_order():
+    events = _events(200)
+
+    nodes = node_factory_parallel(events)
+
+    assert _key(nodes) == sorted(_key(node_factory_many(events)), key=lambda item: item[0])
+
+
+def test_executor_result_matches_the_serial_build():
+    events = _events(500)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        nodes = node_factory_parallel(events, executor=executor, workers=3, threshold=0)
+
+    assert _key(nodes) == _key(node_factory_parallel(events))
+
+
+def test_small_inputs_do_not_touch_the_executor():
+    class Unused:
+        def map(self, *args):
+            raise AssertionError("executor used")
+
+    assert len(node_factory_parallel(_events(10), executor=Unused(), threshold=100)) == 10
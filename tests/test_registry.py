@@ -0,0 +1,95 @@
+import pytest
+
+from log_to_graph.flowchart import node_factory, register_node
+from log_to_graph.flowchart.node import Node, registry
+from tests.fake_humio import make_event
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(monkeypatch):
+    # Each test registers into copies, the built-in handlers stay untouched
+    monkeypatch.setattr(registry, "_exact", dict(registry._exact))
+    monkeypatch.setattr(registry, "_prefixes", dict(registry._prefixes))
+    monkeypatch.setattr(registry, "_resolved", {})
+    monkeypatch.setattr(registry, "_entry_points_loaded", True)
+
+
+class _EntryPoint:
+    def __init__(self, name, target):
+        self.name = name
+        self.target = target
+
+    def load(self):
+        if isinstance(self.target, Exception):
+            raise self.target
+        return self.target
+
+
+class _EntryPoints(list):
+    def select(self, group):
+        return self if group == registry.ENTRY_POINT_GROUP else []
+
+
+def _node_class():
+    class Handler(Node):
+        __slots__ = ()
+    return Handler
+
+
+def test_exact_name_wins_over_prefix():
+    exact = register_node("com.example.pay.Handler")(_node_class())
+    register_node(prefix="com.example.pay")(_node_class())
+
+    assert registry.resolve_node_class("com.example.pay.Handler") is exact
+
+
+def test_longest_prefix_wins():
+    short = register_node(prefix="com.example")(_node_class())
+    long = register_node(prefix="com.example.pay.")(_node_class())
+
+    assert registry.resolve_node_class("com.example.pay.Other") is long
+    assert registry.resolve_node_class("com.example.fraud.Other") is short
+    assert registry.resolve_node_class("org.other.Thing") is Node
+    assert registry.resolve_node_class(None) is Node
+
+
+def test_late_registration_clears_resolved_classes():
+    assert registry.resolve_node_class("com.example.late.Handler") is Node
+
+    late = register_node(prefix="com.example.late")(_node_class())
+
+    assert registry.resolve_node_class("com.example.late.Handler") is late
+    assert type(node_factory(make_event("abc123", 0, **{"class": "com.example.late.Handler"}))) is late
+
+
+def test_exactly_one_of_name_or_prefix():
+    with pytest.raises(ValueError):
+        register_node()
+    with pytest.raises(ValueError):
+        register_node("com.example.A", prefix="com.example")
+
+
+def test_entry_points_are_registered_on_first_lookup(monkeypatch):
+    exact, prefixed = _node_class(), _node_class()
+    monkeypatch.setattr(registry.metadata, "entry_points", lambda: _EntryPoints([
+        _EntryPoint("com.example.plugin.Exact", exact),
+        _EntryPoint("com.example.plugin.*", prefixed),
+    ]))
+    monkeypatch.setattr(registry, "_entry_points_loaded", False)
+
+    assert registry.resolve_node_class("com.example.plugin.Exact") is exact
+    assert registry.resolve_node_class("com.example.plugin.Other") is prefixed
+
+
+def test_broken_entry_point_is_skipped_with_a_warning(monkeypatch):
+    working = _node_class()
+    monkeypatch.setattr(registry.metadata, "entry_points", lambda: _EntryPoints([
+        _EntryPoint("com.example.broken.*", ImportError("no module named broken")),
+        _EntryPoint("com.example.working.*", working),
+    ]))
+    monkeypatch.setattr(registry, "_entry_points_loaded", False)
+
+    with pytest.warns(RuntimeWarning, match="com.example.broken"):
+        assert registry.resolve_node_class("com.example.broken.A") is Node
+
+    assert registry.resolve_node_class("com.example.working.A") is working
@@ -0,0 +1,125 @@
+import subprocess
+
+import graphviz
+import pytest
+
+from log_to_graph.render import RenderCache, RenderPool, RenderTimeoutError
+from log_to_graph.render import pool as pool_module
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Stand-in for the Graphviz binary: dot always times out, other engines render."""
+    calls = []
+
+    def run(source, engine, format, timeout):
+        calls.append((engine, source))
+        if engine == "dot":
+            raise subprocess.TimeoutExpired(["dot"], timeout)
+        return f"{engine}:{len(source)}".encode()
+
+    monkeypatch.setattr(pool_module, "_run_graphviz", run)
+    return calls
+
+
+def _graph():
+    graph = graphviz.Digraph(graph_attr={"splines": "ortho"})
+    graph.edge("a", "b")
+    return graph
+
+
+def test_fallback_uses_a_cheaper_layout(runs):
+    with RenderPool(workers=1) as pool:
+        data = pool.render(_graph(), "svg")
+
+    engine, source = runs[-1]
+    assert engine == "sfdp"
+    assert source.rstrip().endswith('graph [splines="false"]\n}')
+    assert data.startswith(b"sfdp:")
+
+
+def test_fallback_is_not_cached_as_the_full_layout(runs):
+    cache = RenderCache()
+    graph = _graph()
+    with RenderPool(workers=1, cache=cache) as pool:
+        pool.render(graph, "svg")
+        assert cache.get(RenderCache.key(graph.source, "svg", "dot")) is None
+
+        # A second attempt tries the full layout again, but reuses the stored fallback
+        pool.render(graph, "svg")
+
+    assert [engine for engine, _ in runs] == ["dot", "sfdp", "dot"]
+
+
+def test_timeout_of_the_fallback_too(monkeypatch):
+    def run(source, engine, format, timeout):
+        raise subprocess.TimeoutExpired([engine], timeout)
+
+    monkeypatch.setattr(pool_module, "_run_graphviz", run)
+    with RenderPool(workers=1, timeout=0.1) as pool:
+        with pytest.raises(RenderTimeoutError):
+            pool.render(_graph(), "svg")
+
+
+def test_results_are_cached_under_the_chart_key(monkeypatch):
+    monkeypatch.setattr(pool_module, "_run_graphviz", lambda source, engine, format, timeout: b"<svg/>")
+    cache = RenderCache()
+    graph = _graph()
+    with RenderPool(workers=1, cache=cache) as pool:
+        pool.render(graph, "svg")
+
+    assert cache.get(RenderCache.key(graph.source, "svg", "dot")) == b"<svg/>"
+
+
+def test_unflatten_runs_in_the_worker_after_the_cache_lookup(monkeypatch):
+    unflattened, laid_out = [], []
+
+    def unflatten(source, options, timeout):
+        unflattened.append(options)
+        return source.replace("digraph {", "digraph { // unflattened", 1)
+
+    def run(source, engine, format, timeout):
+        laid_out.append(source)
+        return b"<svg/>"
+
+    monkeypatch.setattr(pool_module, "_run_unflatten", unflatten)
+    monkeypatch.setattr(pool_module, "_run_graphviz", run)
+    cache = RenderCache()
+    graph = _graph()
+    with RenderPool(workers=1, cache=cache) as pool:
+        pool.render(graph, "svg", unflatten={"stagger": 3})
+        pool.render(graph, "svg", unflatten={"stagger": 3})
+
+    assert unflattened == [{"stagger": 3}]
+    assert len(laid_out) == 1 and "// unflattened" in laid_out[0]
+    assert cache.get(RenderCache.key(graph.source, "svg", "dot", {"stagger": 3})) == b"<svg/>"
+    assert cache.get(RenderCache.key(graph.source, "svg", "dot")) is None
+
+
+def test_slow_unflatten_is_skipped(monkeypatch):
+    laid_out = []
+
+    def unflatten(source, options, timeout):
+        raise subprocess.TimeoutExpired(["unflatten"], timeout)
+
+    monkeypatch.setattr(pool_module, "_run_unflatten", unflatten)
+    monkeypatch.setattr(pool_module, "_run_graphviz",
+                        lambda source, engine, format, timeout: laid_out.append(source) or b"<svg/>")
+    graph = _graph()
+    with RenderPool(workers=1) as pool:
+        assert pool.render(graph, "svg", unflatten={"stagger": 3}) == b"<svg/>"
+
+    assert laid_out == [graph.source]
+
+
+def test_unflatten_options_become_command_line_flags(monkeypatch):
+    commands = []
+
+    def run(cmd, input, **kwargs):
+        commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, input, b"")
+
+    monkeypatch.setattr(pool_module.subprocess, "run", run)
+
+    assert pool_module._run_unflatten("digraph {}", {"stagger": 5, "fanout": True, "chain": 5}, 1) == "digraph {}"
+    assert commands == [["unflatten", "-l", "5", "-f", "-c", "5"]]
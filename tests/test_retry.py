@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from log_to_graph.humio import QueryFailedError, QueryStats, RetryPolicy, query_logs
+from tests.fake_humio import make_event
+
+FAST_RETRY = RetryPolicy(base_delay=0.01, max_delay=0.05)
+
+
+def _query(humio, retry=FAST_RETRY, **kwargs):
+    return query_logs("token", "repo", "3h", "abc123", base_url=humio.base_url, retry=retry, **kwargs)
+
+
+def test_transient_errors_are_retried(humio):
+    humio.events = {"abc123": [make_event("abc123", i) for i in range(3)]}
+    humio.failures = [500, 503, 429]
+    stats = QueryStats()
+
+    event_map = _query(humio, stats=stats)
+
+    assert len(event_map["abc123"]) == 3
+    assert stats.retries == 3
+
+
+def test_client_errors_are_not_retried(humio):
+    humio.failures = [400]
+
+    with pytest.raises(QueryFailedError) as raised:
+        _query(humio)
+
+    assert raised.value.stats.retries == 0
+
+
+def test_expired_job_is_recreated_without_duplicates(humio):
+    humio.events = {"abc123": [make_event("abc123", i) for i in range(3)]}
+    humio.segments = 2
+    # First job: running, first segment, then gone
+    humio.failures = [None, None, 404]
+    stats = QueryStats()
+
+    event_map = _query(humio, stats=stats)
+
+    assert [event["message"] for event in event_map["abc123"]] == ["event 0", "event 1", "event 2"]
+    assert stats.restarts == 1
+    assert stats.events == 3
+    assert len(humio.jobs) == 2
+
+
+def test_gives_up_with_partial_results(humio):
+    humio.events = {"abc123": [make_event("abc123", i) for i in range(3)]}
+    humio.segments = 2
+    humio.failures = [None, None, 500, 500]
+
+    with pytest.raises(QueryFailedError) as raised:
+        _query(humio, retry=RetryPolicy(max_retries=1, base_delay=0.01))
+    assert len(raised.value.partial["abc123"]) == 3
+
+    humio.failures = [None, None, 500, 500]
+    assert len(_query(humio, retry=RetryPolicy(max_retries=1, base_delay=0.01),
+                      allow_partial=True)["abc123"]) == 3
+
+
+def test_hung_request_is_bounded_by_the_deadline(humio):
+    humio.delays = {"abc123": 5.0}
+    started = time.monotonic()
+
+    with pytest.raises(QueryFailedError):
+        _query(humio, retry=RetryPolicy(base_delay=0.01, deadline=0.5))
+
+    assert time.monotonic() - started < 2
+
+
+def test_hung_request_times_out(humio):
+    humio.delays = {"abc123": 5.0}
+    stats = QueryStats()
+    started = time.monotonic()
+
+    with pytest.raises(QueryFailedError):
+        _query(humio, retry=RetryPolicy(max_retries=1, base_delay=0.01, request_timeout=0.2), stats=stats)
+
+    assert stats.retries == 1
+    assert time.monotonic() - started < 2
+
+
+def test_poll_wait_is_bounded_by_the_deadline(humio):
+    humio.poll_after = 60_000
+    started = time.monotonic()
+
+    with pytest.raises(QueryFailedError):
+        _query(humio, retry=RetryPolicy(deadline=0.3))
+
+    assert time.monotonic() - started < 2
@@ -0,0 +1,89 @@
+import time
+
+from log_to_graph.flowchart import node_factory
+from log_to_graph.flowchart.node import StacktraceCondenser
+from tests.fake_humio import make_event
+
+
+def _trace(*sections):
+    lines = []
+    for header, frames in sections:
+        lines.append(header)
+        lines.extend(f"\tat {frame}" for frame in frames)
+    return "\n".join(lines)
+
+
+def test_frames_outside_the_packages_collapse_to_one_marker():
+    message = _trace(("java.lang.IllegalStateException: boom",
+                      ["com.starlingbank.a.A(A.java:1)", "org.x.B(B.java:2)", "org.x.C(C.java:3)",
+                       "com.starlingbank.a.D(D.java:4)"]))
+
+    assert StacktraceCondenser().condense(message).split("\n") == [
+        "java.lang.IllegalStateException: boom",
+        "\tat com.starlingbank.a.A(A.java:1)",
+        "...",
+        "\tat com.starlingbank.a.D(D.java:4)",
+    ]
+
+
+def test_short_messages_are_unchanged():
+    assert StacktraceCondenser().condense("plain message") == "plain message"
+
+
+def test_frames_per_exception_are_capped_and_the_cause_still_shown():
+    message = _trace(("java.lang.RuntimeException: outer", [f"com.starlingbank.a.F{i}(F.java:{i})" for i in range(10)]),
+                     ("Caused by: java.io.IOException: inner", ["com.starlingbank.b.G(G.java:1)"]))
+
+    lines = StacktraceCondenser(max_frames=3).condense(message).split("\n")
+
+    assert lines == [
+        "java.lang.RuntimeException: outer",
+        "\tat com.starlingbank.a.F0(F.java:0)",
+        "\tat com.starlingbank.a.F1(F.java:1)",
+        "\tat com.starlingbank.a.F2(F.java:2)",
+        "...",
+        "Caused by: java.io.IOException: inner",
+        "\tat com.starlingbank.b.G(G.java:1)",
+    ]
+
+
+def test_line_budget_keeps_the_last_causes():
+    sections = [("java.lang.RuntimeException: top", ["com.starlingbank.a.A(A.java:1)"])]
+    sections += [(f"Caused by: java.lang.Exception: cause {i}", ["com.starlingbank.a.A(A.java:1)"]) for i in range(20)]
+
+    lines = StacktraceCondenser(max_lines=4, max_causes=2).condense(_trace(*sections)).split("\n")
+
+    assert lines[-2:] == ["Caused by: java.lang.Exception: cause 18", "Caused by: java.lang.Exception: cause 19"]
+    assert lines[-3] == "..."
+    assert len(lines) == 7
+
+
+def test_long_lines_are_cut():
+    condensed = StacktraceCondenser(max_line_length=10).condense("x" * 50)
+
+    assert condensed == "x" * 10 + "..."
+
+
+def test_packages_none_keeps_every_frame():
+    message = _trace(("E", ["org.x.A(A.java:1)", "org.x.B(B.java:2)"]))
+
+    assert StacktraceCondenser(packages=None).condense(message) == message
+
+
+def test_huge_traces_stay_cheap():
+    message = _trace(("java.lang.RuntimeException: outer", ["org.x.Frame(F.java:1)"] * 200_000),
+                     ("Caused by: java.io.IOException: root", ["com.starlingbank.b.G(G.java:1)"]))
+
+    started = time.perf_counter()
+    lines = StacktraceCondenser().condense(message).split("\n")
+
+    assert time.perf_counter() - started < 0.5
+    assert lines == ["java.lang.RuntimeException: outer", "...",
+                     "Caused by: java.io.IOException: root", "\tat com.starlingbank.b.G(G.java:1)"]
+
+
+def test_node_condenses_once():
+    node = node_factory(make_event("abc123", 0, message=_trace(("E", ["org.x.A(A.java:1)"]))))
+
+    assert node.stacktrace() == "E\n..."
+    assert node.stacktrace() is node.stacktrace()
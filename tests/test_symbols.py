@@ -0,0 +1,32 @@
+from log_to_graph.flowchart import node_factory
+from log_to_graph.flowchart.node import SYMBOLS, SymbolTable
+from tests.fake_humio import make_event
+
+
+def test_equal_names_share_one_object():
+    table = SymbolTable()
+    first = table.intern("".join(["cre", "dit"]))
+
+    assert table.intern("".join(["cred", "it"])) is first
+    assert table.class_name("com.starlingbank.a.Foo") == ("com.starlingbank.a", "Foo")
+    assert table.node_id("credit", "Foo") is table.node_id("credit", "Foo")
+
+
+def test_table_is_emptied_once_full():
+    table = SymbolTable(max_size=10)
+
+    for i in range(25):
+        table.intern(f"value-{i}")
+        assert len(table) <= 10
+
+    assert table.intern("value-24") == "value-24"
+
+
+def test_correlation_ids_are_not_interned():
+    node_factory(make_event("warmup", 0))
+    before = len(SYMBOLS)
+
+    for i in range(50):
+        node_factory(make_event(f"trace{i:04}", 0))
+
+    assert len(SYMBOLS) == before
@@ -2,10 +2,13 @@
 Backend logic for the Streamlit web interface.
 Handles Humio queries and flowchart generation.
 """
-from typing import Optional
-from log_to_graph.humio import query_logs
-from log_to_graph.flowchart import node_factory, FlowChart
+import time
+from typing import Iterator, Optional
+from log_to_graph.humio import default_cache, LiveQuery, DEFAULT_LIVE_WINDOW, DEFAULT_RETRY, RetryPolicy
+from log_to_graph.source import EventSource, HumioEventSource
+from log_to_graph.flowchart import node_factory_many, FlowChart
 from log_to_graph.flowchart.theme import Theme
+from log_to_graph.render import default_render_pool
 
 
 def generate_flowchart_svg(
@@ -13,7 +16,8 @@ def generate_flowchart_svg(
     repo: str,
     start: str,
     correlation_id: str,
-    theme: Theme
+    theme: Theme,
+    base_url: Optional[str] = None
 ) -> Optional[str]:
     """
     Query Humio logs and generate a flowchart SVG.
@@ -24,6 +28,7 @@ def generate_flowchart_svg(
         start: Time range for query (e.g., "3h", "1d", "7d")
         correlation_id: Correlation ID to filter logs
         theme: Theme object for flowchart styling
+        base_url: Humio instance URL, defaults to HUMIO_BASE_URL or Humio cloud
 
     Returns:
         SVG string if successful, None if no events found
@@ -31,8 +36,30 @@ def generate_flowchart_svg(
     Raises:
         Exception: If query fails or other errors occur
     """
-    # Query logs from Humio
-    event_map = query_logs(user_token, repo, start, correlation_id)
+    # Query logs from Humio, reusing the pooled client for this token/repo and
+    # the on-disk event cache so re-renders (e.g. theme changes) skip the query
+    source = HumioEventSource(user_token, repo, start,
+                              base_url=base_url, cache=default_cache())
+    return generate_flowchart_svg_from_source(source, correlation_id, theme)
+
+
+def generate_flowchart_svg_from_source(
+    source: EventSource,
+    correlation_id: str,
+    theme: Theme
+) -> Optional[str]:
+    """
+    Read events from any event source and generate a flowchart SVG.
+
+    Args:
+        source: Where to read the events from (Humio, an exported file, ...)
+        correlation_id: Correlation ID to filter logs
+        theme: Theme object for flowchart styling
+
+    Returns:
+        SVG string if successful, None if no events found
+    """
+    event_map = source.query(correlation_id)
 
     if not event_map:
         return None
@@ -49,15 +76,82 @@ def generate_flowchart_svg(
         return None
 
     # Create nodes from events
-    nodes = [node_factory(event) for event in events]
+    nodes = node_factory_many(events)
 
     # Generate flowchart
     flowchart = FlowChart(first_correlation_id, nodes, theme=theme)
 
-    # Generate SVG using graphviz
-    dot = flowchart.to_graphviz()
+    return _render_svg(flowchart)
+
+
+def watch_flowchart_svg(
+    user_token: str,
+    repo: str,
+    correlation_id: str,
+    theme: Theme,
+    window: str = DEFAULT_LIVE_WINDOW,
+    debounce: float = 5.0,
+    poll_interval: float = 1.0,
+    duration: Optional[float] = None,
+    base_url: Optional[str] = None,
+    retry: RetryPolicy = DEFAULT_RETRY
+) -> Iterator[str]:
+    """
+    Follow a correlation ID with a live Humio query and yield updated flowchart SVGs.
+
+    New events are added to the same flowchart as they arrive, and the chart is
+    re-rendered at most once per debounce interval, only when something changed.
+    Events still waiting on the debounce when duration runs out get a final render.
+
+    Args:
+        user_token: Humio API token for authentication
+        repo: Humio repository name
+        correlation_id: Correlation ID to follow
+        theme: Theme object for flowchart styling
+        window: Time window kept by the live query (e.g., "1h")
+        debounce: Minimum number of seconds between two renders
+        poll_interval: Number of seconds between polls of the live query
+        duration: Stop following after this many seconds, None to follow forever
+        base_url: Humio instance URL, defaults to HUMIO_BASE_URL or Humio cloud
+        retry: Retry settings for transient Humio errors while polling
+
+    Yields:
+        SVG string of the flowchart each time it is re-rendered
+    """
+    deadline = None if duration is None else time.monotonic() + duration
+    flowchart: Optional[FlowChart] = None
+    pending = False
+    last_render = float('-inf')
+
+    with LiveQuery(user_token, repo, correlation_id, start=window, base_url=base_url, retry=retry) as live:
+        while deadline is None or time.monotonic() < deadline:
+            events = [event for event in live.poll() if event["correlation_id"] == correlation_id]
+            if events:
+                nodes = node_factory_many(events)
+                if flowchart is None:
+                    flowchart = FlowChart(correlation_id, nodes, theme=theme)
+                else:
+                    flowchart.add_nodes(nodes)
+                pending = True
+
+            now = time.monotonic()
+            if flowchart is not None and pending and now - last_render >= debounce:
+                yield _render_svg(flowchart)
+                last_render = now
+                pending = False
+
+            time.sleep(poll_interval)
+
+    if flowchart is not None and pending:
+        yield _render_svg(flowchart)
+
 
-    # Render to SVG string
-    svg_string = dot.pipe(format='svg').decode('utf-8')
+def _render_svg(flowchart: FlowChart) -> str:
+    # Generate the graph; the unflatten pass the layout policy picks for the
+    # chart's size (none for large charts) runs in the render pool
+    dot, layout = flowchart.to_graphviz_with_layout()
 
-    return svg_string
+    # Render to SVG string on the shared render pool, which bounds concurrent
+    # Graphviz processes, falls back to a simpler layout when one runs too long,
+    # and serves identical charts (same events and theme) from the render cache
+    return default_render_pool().render(dot, format='svg', unflatten=layout.unflatten).decode('utf-8')